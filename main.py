@@ -110,7 +110,10 @@ Configuración:
         engine = _create_engine(args)
         if not engine:
             return 1
-        return run_extended_mode(engine)
+        try:
+            return run_extended_mode(engine)
+        finally:
+            engine.close()
     
     # Modo interactivo
     print("\n--- Selecciona el modo de operación ---")
@@ -132,7 +135,10 @@ Configuración:
         engine = _create_engine(args)
         if not engine:
             return 1
-        return run_extended_mode(engine)
+        try:
+            return run_extended_mode(engine)
+        finally:
+            engine.close()
 
 
 def _create_engine(args) -> SearchEngine:
@@ -183,20 +189,16 @@ def _run_phase1(args) -> int:
     if not engine:
         return 1
     
-    return _run_simple_for_all(engine)
+    try:
+        return _run_simple_for_all(engine)
+    finally:
+        engine.close()
 
 
 def _run_simple_for_all(engine: SearchEngine) -> int:
     """Ejecuta modo sencillo para todas las APIs registradas."""
-    result = 0
-    all_combination_results = {}
-    
-    for api_type in engine.clients.keys():
-        ret, combinations = engine.run_simple_mode(api_type)
-        if ret != 0:
-            result = ret
-        else:
-            all_combination_results[api_type] = combinations
+    # Las APIs se consultan en paralelo (hosts y rate limits independientes)
+    result, all_combination_results = engine.run_simple_mode_all()
     
     # Generar archivo consolidado con TOP 30
     if all_combination_results:
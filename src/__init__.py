@@ -15,6 +15,7 @@ from .base_client import BaseAPIClient
 from .scopus_client import ScopusAPIClient
 from .ieee_client import IEEEAPIClient
 from .wos_client import WOSAPIClient
+from .multi_client import search_all_apis, count_all_apis
 from .input_config import InputConfig
 from .search_engine import SearchEngine, run_extended_mode
 from .phase2_processor import Phase2Processor, run_phase2
@@ -30,6 +31,7 @@ __all__ = [
     # Clients
     'HTTPClient', 'BaseAPIClient', 
     'ScopusAPIClient', 'IEEEAPIClient', 'WOSAPIClient',
+    'search_all_apis', 'count_all_apis',
     # Config & Engine
     'InputConfig', 'SearchEngine', 'run_extended_mode',
     # Phase 2
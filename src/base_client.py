@@ -2,24 +2,46 @@
 Clase base abstracta para clientes de API.
 """
 
+import contextvars
+import itertools
 import os
+import threading
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
 
-from .config import APIConfig
+from .config import APIConfig, MAX_CONCURRENT_REQUESTS, HTTP_MAX_RETRIES
 from .models import SearchFilters
 from .logger import logger
 from .http_client import HTTPClient
+from .rate_limiter import rate_limiter
+from .query_cache import QueryCache, query_cache
+from . import dns_cache
 
 
 class BaseAPIClient(ABC):
     """Clase base abstracta para clientes de API."""
     
+    # Registros solicitados al solo contar resultados: con 0 la respuesta trae
+    # únicamente el total, sin entradas. Si la API lo rechaza se usa 1.
+    COUNT_MAX_RECORDS = 0
+    
+    # Ruta (formato ijson) de la lista de entradas en la respuesta de búsqueda
+    ENTRIES_PATH = ""
+    
     def __init__(self, config: APIConfig):
         self.config = config
         self.api_key: Optional[str] = None
         self.http = HTTPClient()
+        self._count_max_records = self.COUNT_MAX_RECORDS
+        # Conteos en curso por clave de query: los hilos con la misma query comparten el resultado
+        self._inflight: Dict[Tuple[str, str, str], "Future[int]"] = {}
+        self._inflight_lock = threading.Lock()
+        # Todas las búsquedas (en cualquier hilo) comparten el ritmo de la API
+        rate_limiter.set_rate(urlparse(config.base_url).netloc, config.rate_per_minute)
     
     def authenticate(self) -> bool:
         """Obtiene la API key desde variable de entorno."""
@@ -29,6 +51,8 @@ class BaseAPIClient(ABC):
             logger.write(f"Configúrala con: $Env:{self.config.env_var} = 'tu_api_key'")
             return False
         logger.write(f"API Key configurada: {self.api_key[:8]}...{self.api_key[-4:]}")
+        # Resolver el host mientras se preparan las búsquedas
+        dns_cache.prefetch(self.config.base_url)
         return True
     
     @abstractmethod
@@ -48,12 +72,60 @@ class BaseAPIClient(ABC):
         pass
     
     def count_results(self, query: str, filters: SearchFilters) -> int:
-        """Cuenta el total de resultados sin descargar datos."""
-        url = self.build_query_url(query, filters, max_records=1, start=0)
+        """
+        Cuenta el total de resultados sin descargar datos.
+        
+        Los conteos obtenidos en las últimas 24 h (misma API, query y filtros)
+        se toman de la caché de conteos sin consultar la API. Si otro hilo ya
+        está consultando la misma query, se espera su resultado en lugar de
+        repetir el request.
+        """
+        api = self.config.api_type.value
+        cached = query_cache.get(api, query, filters)
+        if cached is not None:
+            return cached
+        
+        key = QueryCache.key(api, query, filters)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+        
+        try:
+            # Un hilo pudo terminar y guardar el conteo entre la primera lectura
+            # de la caché y el registro de esta consulta
+            count = query_cache.get(api, query, filters)
+            if count is None:
+                count = self._fetch_count(query, filters)
+                if count != -1:
+                    query_cache.set(api, query, filters, count)
+            future.set_result(count)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            # Se retira después de guardar en caché: quien llegue luego la encuentra ahí
+            with self._inflight_lock:
+                del self._inflight[key]
+        return count
+    
+    def _fetch_count(self, query: str, filters: SearchFilters) -> int:
+        """Consulta el total de resultados a la API (-1 si hubo error)."""
+        url = self.build_query_url(query, filters, max_records=self._count_max_records, start=0)
         response = self.http.get(url, headers=self._get_headers(), verbose=False,
                                   mask_key=self._get_mask_key())
         
         if "error" in response:
+            # Solo un 400 (parámetros inválidos) indica que count=0 no es válido.
+            # Los errores de autenticación o cuota (401, 403...) no se repiten, y
+            # los transitorios (429, 5xx, red) ya se reintentaron en HTTPClient
+            if self._count_max_records == 0 and response.get("code") == 400:
+                # La API no acepta count=0: pedir 1 registro de aquí en adelante
+                self._count_max_records = 1
+                return self._fetch_count(query, filters)
             return -1
         
         return self.parse_total_results(response)
@@ -65,6 +137,110 @@ class BaseAPIClient(ABC):
         return self.http.get(url, headers=self._get_headers(), verbose=verbose,
                              mask_key=self._get_mask_key())
     
+    @staticmethod
+    def _map_in_context(pool: ThreadPoolExecutor, fn: Callable[[Any], Any],
+                        items: Iterable[Any],
+                        window: int = 2 * MAX_CONCURRENT_REQUESTS) -> Iterator[Any]:
+        """
+        pool.map que ejecuta fn con el contexto (contextvars) del hilo que llama.
+        
+        Así los hilos del pool escriben en el log de la API que los lanzó. A
+        diferencia de pool.map, items se consume a medida que avanzan los
+        resultados: nunca hay más de window tareas enviadas sin leer, por lo
+        que items puede ser un generador largo sin materializarse. Cerrar el
+        generador cancela las tareas que aún no empezaron.
+        """
+        context = contextvars.copy_context()
+        items = iter(items)
+        # Un Context no puede estar activo en dos hilos a la vez: una copia por tarea
+        futures = deque(pool.submit(context.copy().run, fn, item)
+                        for item in itertools.islice(items, window))
+        try:
+            while futures:
+                result = futures.popleft().result()
+                # Reponer la ventana antes de entregar el resultado
+                for item in itertools.islice(items, 1):
+                    futures.append(pool.submit(context.copy().run, fn, item))
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    def iter_count_results(self, queries: Iterable[str], filters: SearchFilters,
+                           max_workers: int = MAX_CONCURRENT_REQUESTS) -> Iterator[int]:
+        """
+        Cuenta los resultados de varias queries de forma concurrente.
+        
+        El trabajo es de I/O (espera de red), por lo que se usan hilos con
+        un máximo de max_workers requests simultáneos hacia la API; el ritmo
+        lo marca el rate limiter por host. Los conteos se generan en el
+        orden de queries a medida que están disponibles.
+        
+        Yields:
+            Conteo de cada query (-1 si hubo error)
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            yield from self._map_in_context(pool, lambda q: self.count_results(q, filters), queries)
+    
+    def count_results_many(self, queries: List[str], filters: SearchFilters,
+                           max_workers: int = MAX_CONCURRENT_REQUESTS) -> List[int]:
+        """
+        Cuenta los resultados de varias queries de forma concurrente.
+        
+        Returns:
+            Lista de conteos en el mismo orden que queries (-1 si hubo error)
+        """
+        return list(self.iter_count_results(queries, filters, max_workers))
+    
+    def search_many(self, queries: List[str], filters: SearchFilters,
+                    max_records: int = 25,
+                    max_workers: int = MAX_CONCURRENT_REQUESTS) -> List[Dict[str, Any]]:
+        """
+        Realiza varias búsquedas de forma concurrente.
+        
+        Returns:
+            Lista de respuestas en el mismo orden que queries
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(self._map_in_context(
+                pool,
+                lambda q: self.search(q, filters, max_records=max_records, verbose=False),
+                queries,
+            ))
+    
+    def iter_document_titles(self, queries: List[str], filters: SearchFilters,
+                             max_docs: int = 200,
+                             max_workers: int = MAX_CONCURRENT_REQUESTS,
+                             stop: Optional[threading.Event] = None) -> Iterator[List[str]]:
+        """
+        Obtiene los títulos de documentos de varias queries de forma concurrente.
+        
+        Si se activa stop, las queries en curso dejan de paginar y cerrar el
+        generador cancela las que aún no empezaron.
+        
+        Yields:
+            Lista de títulos de cada query, en el orden de queries
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            yield from self._map_in_context(
+                pool, lambda q: self.get_document_titles(q, filters, max_docs=max_docs, stop=stop),
+                queries)
+    
+    def stream_entries(self, query: str, filters: SearchFilters,
+                       max_records: int = 25, start: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Genera las entradas de una página de búsqueda a medida que se parsean.
+        
+        Evita materializar respuestas grandes completas en memoria; si el
+        request falla no se genera ninguna entrada, y si la lectura se corta a
+        mitad de la página se propaga la excepción.
+        """
+        url = self.build_query_url(query, filters, max_records, start)
+        for entry in self.http.get_streaming(url, self.ENTRIES_PATH, headers=self._get_headers()):
+            # Scopus devuelve una entrada {"error": ...} cuando no hay resultados
+            if "error" not in entry:
+                yield entry
+    
     def search_all(self, query: str, filters: SearchFilters, 
                    max_results: int = 1000) -> List[Dict[str, Any]]:
         """Busca todos los resultados con paginación automática."""
@@ -120,7 +296,8 @@ class BaseAPIClient(ABC):
         """Extrae los títulos de los documentos. Implementar en subclases."""
         pass
     
-    def get_document_titles(self, query: str, filters: SearchFilters, max_docs: int = 200) -> List[str]:
+    def get_document_titles(self, query: str, filters: SearchFilters, max_docs: int = 200,
+                            stop: Optional[threading.Event] = None) -> List[str]:
         """
         Obtiene los títulos de documentos para una query con paginación.
         
@@ -128,6 +305,7 @@ class BaseAPIClient(ABC):
             query: Query de búsqueda
             filters: Filtros de búsqueda
             max_docs: Máximo de documentos a recuperar
+            stop: Señal de parada opcional; se comprueba antes de cada página
         
         Returns:
             Lista de títulos de documentos
@@ -135,28 +313,38 @@ class BaseAPIClient(ABC):
         all_titles = []
         page_size = self.config.max_per_request
         start = 1  # La mayoría de APIs usan 1-indexed
-        total_results = None
+        # Total de resultados (normalmente ya está en la caché de conteos): evita
+        # pedir una página vacía cuando el total es múltiplo del tamaño de página
+        total_results = self.count_results(query, filters)
+        failures = 0
         
         while len(all_titles) < max_docs:
-            url = self.build_query_url(query, filters, max_records=page_size, start=start)
-            response = self.http.get(url, headers=self._get_headers(), verbose=False,
-                                     mask_key=self._get_mask_key())
-            
-            if "error" in response:
+            if stop is not None and stop.is_set():
                 break
             
-            if total_results is None:
-                total_results = self.parse_total_results(response)
+            # Las entradas se reducen a títulos a medida que llegan
+            page_titles = []
+            received = 0
+            try:
+                for entry in self.stream_entries(query, filters, max_records=page_size, start=start):
+                    received += 1
+                    page_titles.extend(self.extract_document_titles([entry]))
+            except Exception as e:
+                # Lectura cortada a mitad de la página: se reintenta la página completa
+                failures += 1
+                if failures > HTTP_MAX_RETRIES:
+                    logger.write(f"Títulos incompletos ({len(all_titles)}) para {query}: {e}")
+                    break
+                time.sleep(self.http._retry_delay(failures - 1, None))
+                continue
+            all_titles.extend(page_titles)
             
-            entries = self.parse_entries(response)
-            if not entries:
+            # Página vacía (o error) o incompleta: no hay más resultados
+            if received < page_size:
                 break
             
-            titles = self.extract_document_titles(entries)
-            all_titles.extend(titles)
-            
             start += page_size
-            if start > (total_results or 0):
+            if 0 <= total_results < start:
                 break
             
             # Pequeña pausa entre páginas
@@ -16,6 +16,55 @@ OUTPUTS_DIR = "outputs"
 LOG_DIR = "outputs/logs"
 INPUT_FILE = "definitions/input.json"
 CONSOLIDATED_OUTPUT_PREFIX = "output_consolidado"
+CACHE_DIR = "outputs/.cache"
+HTTP_CACHE_FILE = f"{CACHE_DIR}/http_cache.sqlite"
+HTTP_CACHE_TTL = 86400   # Segundos que se conserva una respuesta para revalidarla (1 día)
+QUERY_CACHE_FILE = f"{CACHE_DIR}/query_cache.sqlite"
+QUERY_CACHE_TTL = 86400  # Segundos que un conteo se considera vigente (1 día)
+CHECKPOINT_PREFIX = f"{OUTPUTS_DIR}/.checkpoint"  # + _<api>_<hash>.jsonl
+
+
+# =============================================================================
+# RED / HTTP
+# =============================================================================
+
+DNS_CACHE_TTL = 300        # Segundos que se reutiliza una resolución DNS
+DNS_CACHE_MAX_ENTRIES = 32
+
+# Ritmo por defecto de hosts sin rate_per_minute en su APIConfig (o hasta que
+# sus headers de rate limit indiquen otro)
+DEFAULT_RATE_PER_MINUTE = 240
+
+# Timeouts de cada request (segundos): conexión y lectura
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 30
+
+# Requests simultáneos como máximo hacia un mismo host (una API)
+MAX_CONCURRENT_REQUESTS = 8
+
+# Respuestas a partir de este tamaño se parsean en streaming (si ijson está instalado).
+# Se compara con Content-Length, es decir, bytes en el cable: con gzip/br es el
+# tamaño comprimido, y las respuestas chunked (sin Content-Length) siempre se
+# parsean en streaming
+STREAM_MIN_BYTES = 256 * 1024
+
+# Bytes del body de un error que se leen para el diagnóstico
+ERROR_BODY_MAX_BYTES = 4096
+
+# Reintentos ante errores transitorios (rate limit / fallos del servidor)
+HTTP_RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+HTTP_MAX_RETRIES = 5
+HTTP_BACKOFF_FACTOR = 0.5  # Espera base: factor * 2^intento (con jitter)
+HTTP_BACKOFF_MAX = 30      # Espera máxima entre reintentos (segundos)
+
+
+# =============================================================================
+# BÚSQUEDA
+# =============================================================================
+
+# A partir de este número de keywords se cuentan primero los pares para omitir
+# las ternas que contienen un par sin resultados (C(K,2) <= C(K,3)/2 desde K=8)
+PAIR_PREFILTER_MIN_KEYWORDS = 8
 
 
 # =============================================================================
@@ -33,7 +82,7 @@ class APIType(Enum):
 # CONFIGURACIÓN DE APIs
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class APIConfig:
     """Configuración específica de una API."""
     api_type: APIType
@@ -42,6 +91,8 @@ class APIConfig:
     max_per_request: int
     output_counts_file: str
     output_results_file: str
+    output_progress_file: str
+    rate_per_minute: float  # Requests por minuto permitidos por la API
 
 
 # Configuraciones de cada API
@@ -53,6 +104,8 @@ API_CONFIGS = {
         max_per_request=25,
         output_counts_file=f"{OUTPUTS_DIR}/scopus_counts.json",
         output_results_file=f"{OUTPUTS_DIR}/scopus_results.json",
+        output_progress_file=f"{OUTPUTS_DIR}/scopus_counts.ndjson",
+        rate_per_minute=540,  # 9 requests/s
     ),
     APIType.IEEE: APIConfig(
         api_type=APIType.IEEE,
@@ -61,6 +114,8 @@ API_CONFIGS = {
         max_per_request=200,
         output_counts_file=f"{OUTPUTS_DIR}/ieee_counts.json",
         output_results_file=f"{OUTPUTS_DIR}/ieee_results.json",
+        output_progress_file=f"{OUTPUTS_DIR}/ieee_counts.ndjson",
+        rate_per_minute=60,  # 1 request/s
     ),
     APIType.WOS: APIConfig(
         api_type=APIType.WOS,
@@ -69,5 +124,7 @@ API_CONFIGS = {
         max_per_request=100,
         output_counts_file=f"{OUTPUTS_DIR}/wos_counts.json",
         output_results_file=f"{OUTPUTS_DIR}/wos_results.json",
+        output_progress_file=f"{OUTPUTS_DIR}/wos_counts.ndjson",
+        rate_per_minute=120,  # 2 requests/s
     ),
 }
@@ -0,0 +1,78 @@
+"""
+Caché de resoluciones DNS para los hosts de las APIs.
+"""
+
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from urllib3.util.connection import allowed_gai_family
+
+from .config import DNS_CACHE_TTL, DNS_CACHE_MAX_ENTRIES
+
+
+_original_getaddrinfo = socket.getaddrinfo
+_cache: Dict[Tuple[Any, ...], Tuple[float, List[Any]]] = {}
+_lock = threading.Lock()
+
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    """Versión de socket.getaddrinfo que reutiliza resultados durante DNS_CACHE_TTL."""
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+    
+    with _lock:
+        entry = _cache.get(key)
+    if entry and entry[0] > now:
+        return entry[1]
+    
+    result = _original_getaddrinfo(host, port, family, type, proto, flags)
+    
+    with _lock:
+        _cache.pop(key, None)
+        if len(_cache) >= DNS_CACHE_MAX_ENTRIES:
+            # Descartar la entrada más antigua (orden de inserción)
+            _cache.pop(next(iter(_cache)))
+        _cache[key] = (now + DNS_CACHE_TTL, result)
+    return result
+
+
+def install() -> None:
+    """Reemplaza socket.getaddrinfo por la versión con caché (idempotente)."""
+    socket.getaddrinfo = _cached_getaddrinfo
+
+
+def uninstall() -> None:
+    """Restaura socket.getaddrinfo original."""
+    socket.getaddrinfo = _original_getaddrinfo
+
+
+def clear() -> None:
+    """Vacía la caché."""
+    with _lock:
+        _cache.clear()
+
+
+def prefetch(url: str) -> None:
+    """
+    Resuelve en segundo plano el host de una URL para que la primera
+    conexión encuentre la respuesta DNS ya en caché.
+    
+    Usa los mismos argumentos que urllib3 al abrir la conexión, de modo
+    que la entrada resultante coincide con la clave que se consultará.
+    """
+    parts = urlsplit(url)
+    if not parts.hostname:
+        return
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    
+    def resolve():
+        try:
+            _cached_getaddrinfo(parts.hostname, port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            # Sin red o host inválido: la conexión real reportará el error
+            pass
+    
+    threading.Thread(target=resolve, name="dns-prefetch", daemon=True).start()
@@ -0,0 +1,90 @@
+"""
+Caché en disco de respuestas HTTP para requests condicionales (ETag / Last-Modified).
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from .config import HTTP_CACHE_FILE, HTTP_CACHE_TTL
+
+
+class HTTPCache:
+    """
+    Guarda el body de cada respuesta junto con su ETag / Last-Modified.
+    
+    Las entradas se indexan por el hash SHA-256 de la URL para no guardar en
+    claro las API keys que algunas APIs (IEEE) llevan en la query string.
+    Las respuestas guardadas hace más de HTTP_CACHE_TTL se ignoran y se
+    eliminan del disco al abrir la caché, por lo que el archivo no crece
+    entre ejecuciones más allá de las respuestas del último día.
+    """
+    
+    def __init__(self, filepath: str = HTTP_CACHE_FILE, ttl: float = HTTP_CACHE_TTL):
+        self.filepath = filepath
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def lookup(self, url: str) -> Optional[Tuple[Optional[str], Optional[str], bytes]]:
+        """Retorna (etag, last_modified, body) vigentes de la URL, o None si no está en caché."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT etag, last_modified, body FROM responses WHERE key = ? AND stored_at >= ?",
+                (self._key(url), time.time() - self.ttl),
+            ).fetchone()
+        return row
+    
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str],
+              body: bytes) -> None:
+        """Guarda (o reemplaza) la respuesta de la URL."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, body, stored_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self._key(url), etag, last_modified, body, time.time()),
+            )
+            conn.commit()
+    
+    def clear(self) -> None:
+        """Elimina todas las respuestas guardadas."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+    
+    def close(self) -> None:
+        """Cierra la conexión a la base de datos."""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            dir_path = os.path.dirname(self.filepath)
+            if dir_path and not os.path.exists(dir_path):
+                os.makedirs(dir_path)
+            self._conn = sqlite3.connect(self.filepath, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                "body BLOB NOT NULL, stored_at REAL NOT NULL)"
+            )
+            # Purgar las respuestas vencidas de ejecuciones anteriores
+            self._conn.execute("DELETE FROM responses WHERE stored_at < ?",
+                               (time.time() - self.ttl,))
+            self._conn.commit()
+        return self._conn
+    
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+# Caché global compartida por todos los clientes
+http_cache = HTTPCache()
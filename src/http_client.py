@@ -3,12 +3,128 @@ Cliente HTTP genérico para requests a las APIs.
 """
 
 import json
+import random
+import re
 import time
-import urllib.request
-import urllib.error
-from typing import Any, Dict, Optional
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, Optional, Union
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+try:
+    import ijson
+except ImportError:  # Opcional: sin ijson las respuestas se parsean completas
+    ijson = None
+
+try:
+    # orjson parsea directamente desde bytes y es varias veces más rápido
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+from .config import (
+    HTTP_RETRY_STATUS, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR, HTTP_BACKOFF_MAX,
+    STREAM_MIN_BYTES, ERROR_BODY_MAX_BYTES, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+)
 from .logger import logger
+from .http_cache import http_cache
+from .rate_limiter import rate_limiter
+from . import dns_cache
+
+
+# Las APIs se consultan siempre en los mismos hosts: evitar una resolución DNS por request
+dns_cache.install()
+
+
+def _create_session() -> requests.Session:
+    """Crea la sesión compartida con pool de conexiones keep-alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Sesión compartida: reutiliza conexiones TCP/TLS entre requests al mismo host
+_SESSION = _create_session()
+
+
+# Headers de respuesta relevantes para el diagnóstico de errores
+_INTERESTING_HEADER = re.compile(r"^(x-|www-|retry)", re.IGNORECASE).match
+
+
+# Patrones compilados para enmascarar parámetros de la URL, por nombre de parámetro
+_MASK_RE_CACHE: Dict[str, "re.Pattern[str]"] = {}
+
+
+def _mask_value(match: "re.Match[str]") -> str:
+    value = match.group(2)
+    if len(value) > 12:
+        value = value[:8] + "..." + value[-4:]
+    return match.group(1) + value
+
+
+def _mask_url(url: str, mask_key: str) -> str:
+    """Enmascara en una sola pasada el valor del parámetro mask_key (API key) en la URL."""
+    pattern = _MASK_RE_CACHE.get(mask_key)
+    if pattern is None:
+        pattern = _MASK_RE_CACHE.setdefault(mask_key, re.compile(rf"({re.escape(mask_key)}=)([^&]+)"))
+    return pattern.sub(_mask_value, url)
+
+
+def _iter_path(data: Any, item_path: str) -> Iterator[Any]:
+    """Recorre un JSON ya parseado siguiendo una ruta en formato ijson."""
+    *keys, last = item_path.split(".")
+    for key in keys:
+        data = data.get(key) if isinstance(data, dict) else None
+    if last != "item":
+        data = data.get(last) if isinstance(data, dict) else None
+        if data is not None:
+            yield data
+    elif isinstance(data, list):
+        yield from data
+    elif isinstance(data, dict):
+        # Algunas APIs (WoS) devuelven un dict cuando hay un solo elemento
+        yield data
+
+
+def _stream_items(raw: Any, item_path: str) -> Iterator[Any]:
+    """
+    Genera los elementos en item_path parseando el body a medida que llega.
+    
+    Equivale a ijson.items(raw, item_path), pero si la ruta termina en
+    '.item' y el contenedor es un dict en lugar de una lista (WoS con un solo
+    elemento), genera ese dict, igual que _iter_path con el JSON completo.
+    """
+    parent = item_path[:-len(".item")] if item_path.endswith(".item") else None
+    events = ijson.parse(raw)
+    for prefix, event, value in events:
+        if prefix == item_path:
+            if event == "end_array" or event == "end_map":
+                continue
+        elif not (prefix == parent and event == "start_map"):
+            continue
+        
+        if event != "start_map" and event != "start_array":
+            # Elemento escalar de la lista
+            yield value
+            continue
+        
+        # Construir el objeto completo con los eventos hasta su cierre
+        builder = ijson.ObjectBuilder()
+        builder.event(event, value)
+        depth = 1
+        for _, event, value in events:
+            builder.event(event, value)
+            if event == "start_map" or event == "start_array":
+                depth += 1
+            elif event == "end_map" or event == "end_array":
+                depth -= 1
+                if depth == 0:
+                    break
+        yield builder.value
 
 
 class HTTPClient:
@@ -16,122 +132,291 @@ class HTTPClient:
     
     @staticmethod
     def get(url: str, headers: Optional[Dict[str, str]] = None, 
-            verbose: bool = True, mask_key: Optional[str] = None) -> Dict[str, Any]:
+            verbose: bool = True, mask_key: Optional[str] = None,
+            no_cache: bool = False) -> Dict[str, Any]:
         """
         Realiza un request GET y retorna el JSON parseado.
         
+        Los errores transitorios (429, 5xx y fallos de conexión o timeout) se
+        reintentan con backoff exponencial con jitter, respetando el header
+        Retry-After. Los demás errores (401, 403...) no se reintentan.
+        
+        Si la URL ya se descargó antes con ETag o Last-Modified, el request es
+        condicional y una respuesta 304 se resuelve con el body en caché.
+        
         Args:
             url: URL del request
             headers: Headers opcionales
             verbose: Si True, imprime detalles
             mask_key: Clave a enmascarar en la URL para logs
+            no_cache: Si True, ignora la caché HTTP (útil para depurar)
+        """
+        default_headers = HTTPClient._build_headers(headers)
+        
+        if verbose:
+            display_url = _mask_url(url, mask_key) if mask_key else url
+            logger.header("REQUEST")
+            logger.write(f"URL: {display_url}")
+        
+        cached = None if no_cache else http_cache.lookup(url)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                default_headers["If-None-Match"] = etag
+            if last_modified:
+                default_headers["If-Modified-Since"] = last_modified
+        
+        resp = HTTPClient._send(url, default_headers, verbose)
+        if isinstance(resp, dict):
+            return resp
+        
+        # Un body que no es JSON (página de mantenimiento, proxy...) es un error
+        # del request, no una excepción para quien llama (_send ya leyó el body)
+        try:
+            if resp.status_code == 304 and cached:
+                return _json_loads(cached[2])
+            
+            body = resp.content
+            data = _json_loads(body)
+        except Exception as e:
+            logger.write(f"Request failed: {e}")
+            return {"error": str(e)}
+        finally:
+            resp.close()
+        
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not no_cache and (etag or last_modified):
+            http_cache.store(url, etag, last_modified, body)
+        
+        return data
+    
+    @staticmethod
+    def get_streaming(url: str, item_path: str,
+                      headers: Optional[Dict[str, str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Realiza un request GET y genera los elementos de la lista en item_path.
+        
+        Con ijson instalado, las respuestas grandes (o sin Content-Length) se
+        parsean a medida que llegan del socket, sin materializar el body
+        completo. Las respuestas pequeñas, o sin ijson, se parsean con json.
+        El tamaño es el de Content-Length (bytes en el cable, comprimidos si
+        el servidor usa gzip/br), no el del JSON decodificado.
+        Si el request falla no se genera ningún elemento. Si el body no es
+        JSON válido o la conexión se corta a mitad de la lectura, el error se
+        registra y se propaga: quien llama puede reintentar la página en vez
+        de tomarla por una página corta.
+        
+        Args:
+            url: URL del request
+            item_path: Ruta en formato ijson (ej: 'search-results.entry.item')
+            headers: Headers opcionales
+        """
+        resp = HTTPClient._send(url, HTTPClient._build_headers(headers), verbose=False, read_body=False)
+        if isinstance(resp, dict):
+            return
+        
+        with resp:
+            try:
+                # Tamaño en el cable (comprimido); 0 si la respuesta es chunked
+                size = int(resp.headers.get("Content-Length") or 0)
+                if ijson is None or 0 < size <= STREAM_MIN_BYTES:
+                    yield from _iter_path(_json_loads(resp.content), item_path)
+                else:
+                    resp.raw.decode_content = True
+                    yield from _stream_items(resp.raw, item_path)
+            except Exception as e:
+                # Body no JSON o conexión cortada a mitad de la lectura
+                logger.write(f"Request failed: {e}")
+                raise
+    
+    @staticmethod
+    def close() -> None:
         """
+        Cierra las conexiones keep-alive de la sesión compartida y la caché HTTP.
+        
+        La sesión sigue siendo utilizable: un request posterior abre
+        conexiones nuevas.
+        """
+        _SESSION.close()
+        http_cache.close()
+    
+    @staticmethod
+    def _build_headers(headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """Combina los headers por defecto con los específicos de la API."""
         default_headers = {
             "Accept": "application/json",
+            # Compresión que urllib3 sabe decodificar (br/zstd si hay soporte instalado)
+            "Accept-Encoding": ACCEPT_ENCODING,
             "User-Agent": "Python-LitReview-Client/2.0",
         }
         if headers:
             default_headers.update(headers)
+        return default_headers
+    
+    @staticmethod
+    def _send(url: str, headers: Dict[str, str], verbose: bool,
+              read_body: bool = True) -> Union[requests.Response, Dict[str, Any]]:
+        """
+        Envía el GET aplicando rate limit y reintentos.
         
-        if verbose:
-            display_url = url
-            if mask_key and mask_key in url:
-                # Enmascarar API key en logs
-                parts = url.split(mask_key + "=")
-                if len(parts) > 1:
-                    key_part = parts[1].split("&")[0]
-                    if len(key_part) > 12:
-                        masked = key_part[:8] + "..." + key_part[-4:]
-                        display_url = url.replace(key_part, masked)
-            logger.header("REQUEST")
-            logger.write(f"URL: {display_url}")
-        
-        req = urllib.request.Request(url=url, headers=default_headers, method="GET")
+        La respuesta se abre en modo streaming, de modo que los errores no
+        descargan páginas de error completas. Con read_body, el body de una
+        respuesta exitosa se lee aquí: una respuesta cortada a mitad se
+        reintenta como cualquier fallo de red. Sin read_body (streaming), quien
+        llama lee el body y maneja sus errores.
         
-        start = time.time()
-        try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
+        Returns:
+            La respuesta (2xx/3xx) o un dict {"error": ..., "code": ...} si el request falló
+        """
+        for attempt in range(HTTP_MAX_RETRIES + 1):
+            rate_limiter.acquire(url)
+            start = time.time()
+            try:
+                resp = _SESSION.get(url, headers=headers, stream=True,
+                                   timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
                 elapsed = time.time() - start
+                rate_limiter.update(url, resp.headers)
+                resp.raise_for_status()
+                if read_body:
+                    resp.content  # Descarga el body completo (queda en resp)
                 
                 if verbose:
                     logger.header("RESPONSE")
-                    logger.write(f"Status: {resp.status} {resp.reason}")
+                    logger.write(f"Status: {resp.status_code} {resp.reason}")
                     logger.write(f"Elapsed: {elapsed:.2f}s")
                 
-                data = resp.read().decode("utf-8")
-                return json.loads(data)
-                
-        except urllib.error.HTTPError as e:
-            elapsed = time.time() - start
-            if verbose:
-                logger.header("ERROR HTTP")
-            logger.write(f"HTTP Error: {e.code} {e.reason}")
-            logger.write(f"Elapsed: {elapsed:.2f}s")
-            
-            # Capturar headers de error para diagnóstico
-            try:
-                error_headers = dict(e.headers)
-                logger.write("")
-                logger.write("=== DIAGNÓSTICO DE ERROR ===")
-                
-                # Headers específicos de error (IEEE/Mashery)
-                if "X-Error-Detail-Header" in error_headers:
-                    logger.write(f"Error Detail: {error_headers['X-Error-Detail-Header']}")
-                if "X-Mashery-Error-Code" in error_headers:
-                    logger.write(f"Error Code: {error_headers['X-Mashery-Error-Code']}")
+                return resp
                 
-                # Headers específicos de Scopus/Elsevier
-                if "X-ELS-Status" in error_headers:
-                    logger.write(f"Elsevier Status: {error_headers['X-ELS-Status']}")
+            except requests.HTTPError as e:
+                error_resp = e.response
                 
-                # Headers específicos de WOS/Clarivate
-                if "X-RateLimit-Remaining" in error_headers:
-                    logger.write(f"Rate Limit Remaining: {error_headers['X-RateLimit-Remaining']}")
+                if error_resp.status_code in HTTP_RETRY_STATUS and attempt < HTTP_MAX_RETRIES:
+                    error_resp.close()
+                    delay = HTTPClient._retry_delay(attempt, error_resp.headers.get("Retry-After"))
+                    logger.write(f"HTTP Error: {error_resp.status_code} {error_resp.reason} - reintento "
+                                 f"{attempt + 1}/{HTTP_MAX_RETRIES} en {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
                 
-                # Mostrar todos los headers relevantes
-                logger.write("")
-                logger.write("Headers de respuesta:")
-                for key, value in error_headers.items():
-                    if key.lower().startswith(('x-', 'www-', 'retry')):
-                        logger.write(f"  {key}: {value}")
-                
-            except Exception:
-                pass
-            
-            # Capturar body del error
+                # El diagnóstico completo solo se construye en modo verbose
+                if verbose:
+                    HTTPClient._log_http_error(error_resp, elapsed)
+                else:
+                    logger.write(f"HTTP Error: {error_resp.status_code} {error_resp.reason}")
+                error_resp.close()
+                # Mismo formato que urllib: sin la URL (puede contener la API key)
+                return {"error": f"HTTP Error {error_resp.status_code}: {error_resp.reason}",
+                        "code": error_resp.status_code}
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                # Fallos de red transitorios (conexión reseteada, timeout, body cortado)
+                if attempt < HTTP_MAX_RETRIES:
+                    delay = HTTPClient._retry_delay(attempt, None)
+                    logger.write(f"Request failed: {e} - reintento "
+                                 f"{attempt + 1}/{HTTP_MAX_RETRIES} en {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                logger.write(f"Request failed: {e}")
+                return {"error": str(e)}
+            except Exception as e:
+                logger.write(f"Request failed: {e}")
+                return {"error": str(e)}
+    
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+        """
+        Calcula la espera antes del siguiente reintento.
+        
+        Usa Retry-After si el servidor lo envía (en segundos o como fecha HTTP);
+        si no, backoff exponencial con full jitter. En ambos casos la espera
+        se acota a HTTP_BACKOFF_MAX.
+        """
+        if retry_after:
+            retry_after = retry_after.strip()
+            if retry_after.isdigit():
+                return min(float(retry_after), HTTP_BACKOFF_MAX)
             try:
-                error_body = e.read().decode("utf-8")
-                logger.write("")
-                logger.write(f"Response Body: {error_body[:500]}")
-                
-                # Mensajes de ayuda según el error
-                if e.code == 403:
-                    logger.write("")
-                    logger.write("=== POSIBLES SOLUCIONES ===")
-                    if "Developer Inactive" in error_body or "DEVELOPER_INACTIVE" in str(e.headers):
-                        logger.write("• Tu cuenta de desarrollador está INACTIVA")
-                        logger.write("• Revisa tu email para activar la cuenta")
-                        logger.write("• Verifica el estado en el portal de desarrollador")
-                    else:
-                        logger.write("• Verifica que tu API key sea válida")
-                        logger.write("• Confirma que tu suscripción esté activa")
-                        logger.write("• Revisa los límites de tu plan")
-                elif e.code == 401:
-                    logger.write("")
-                    logger.write("=== POSIBLES SOLUCIONES ===")
-                    logger.write("• API key inválida o no proporcionada")
-                    logger.write("• Verifica la variable de entorno")
-                elif e.code == 429:
-                    logger.write("")
-                    logger.write("=== POSIBLES SOLUCIONES ===")
-                    logger.write("• Has excedido el límite de requests")
-                    logger.write("• Espera unos minutos antes de reintentar")
-                    
-            except Exception:
+                retry_at = parsedate_to_datetime(retry_after)
+                return min(max(0.0, retry_at.timestamp() - time.time()), HTTP_BACKOFF_MAX)
+            except (TypeError, ValueError):
                 pass
-            
-            logger.write("=" * 40)
-            return {"error": str(e)}
-        except Exception as e:
-            logger.write(f"Request failed: {e}")
-            return {"error": str(e)}
+        return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_FACTOR * (2 ** attempt)))
+    
+    @staticmethod
+    def _log_http_error(resp: requests.Response, elapsed: float) -> None:
+        """Registra el diagnóstico de un error HTTP no recuperable."""
+        logger.header("ERROR HTTP")
+        
+        # El diagnóstico se acumula y se escribe en una sola llamada al logger
+        lines = [
+            f"HTTP Error: {resp.status_code} {resp.reason}",
+            f"Elapsed: {elapsed:.2f}s",
+        ]
+        add = lines.append
+        
+        # Headers de error para diagnóstico (acceso directo, sin copiar el mapa)
+        error_headers = resp.headers
+        add("")
+        add("=== DIAGNÓSTICO DE ERROR ===")
+        
+        # Headers específicos de error (IEEE/Mashery)
+        error_detail = error_headers.get("X-Error-Detail-Header")
+        if error_detail:
+            add(f"Error Detail: {error_detail}")
+        error_code = error_headers.get("X-Mashery-Error-Code")
+        if error_code:
+            add(f"Error Code: {error_code}")
+        
+        # Headers específicos de Scopus/Elsevier
+        els_status = error_headers.get("X-ELS-Status")
+        if els_status:
+            add(f"Elsevier Status: {els_status}")
+        
+        # Headers específicos de WOS/Clarivate
+        remaining = error_headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            add(f"Rate Limit Remaining: {remaining}")
+        
+        # Mostrar todos los headers relevantes
+        add("")
+        add("Headers de respuesta:")
+        for key, value in error_headers.items():
+            if _INTERESTING_HEADER(key):
+                add(f"  {key}: {value}")
+        
+        # Capturar body del error (acotado: las páginas de error pueden ser grandes)
+        try:
+            error_body = resp.raw.read(ERROR_BODY_MAX_BYTES, decode_content=True).decode("utf-8", errors="replace")
+        except Exception:
+            # Body cortado o mal codificado: el diagnóstico sigue sin él
+            error_body = ""
+        
+        add("")
+        add(f"Response Body: {error_body[:500]}")
+        
+        # Mensajes de ayuda según el error
+        if resp.status_code == 403:
+            add("")
+            add("=== POSIBLES SOLUCIONES ===")
+            if "Developer Inactive" in error_body or error_code == "ERR_403_DEVELOPER_INACTIVE":
+                add("• Tu cuenta de desarrollador está INACTIVA")
+                add("• Revisa tu email para activar la cuenta")
+                add("• Verifica el estado en el portal de desarrollador")
+            else:
+                add("• Verifica que tu API key sea válida")
+                add("• Confirma que tu suscripción esté activa")
+                add("• Revisa los límites de tu plan")
+        elif resp.status_code == 401:
+            add("")
+            add("=== POSIBLES SOLUCIONES ===")
+            add("• API key inválida o no proporcionada")
+            add("• Verifica la variable de entorno")
+        elif resp.status_code == 429:
+            add("")
+            add("=== POSIBLES SOLUCIONES ===")
+            add("• Has excedido el límite de requests")
+            add("• Espera unos minutos antes de reintentar")
+        
+        add("=" * 40)
+        logger.write("\n".join(lines))
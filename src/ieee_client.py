@@ -3,7 +3,7 @@ Cliente para la API de IEEE Xplore.
 """
 
 import urllib.parse
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .config import API_CONFIGS, APIType
 from .models import SearchFilters, IEEEFilters
@@ -13,6 +13,9 @@ from .base_client import BaseAPIClient
 class IEEEAPIClient(BaseAPIClient):
     """Cliente para la API de IEEE Xplore."""
     
+    # Ruta de las entradas en la respuesta de búsqueda
+    ENTRIES_PATH = "articles.item"
+    
     # Tipos de contenido válidos (case sensitive)
     CONTENT_TYPES = [
         "Books",
@@ -26,28 +29,49 @@ class IEEEAPIClient(BaseAPIClient):
     
     def __init__(self):
         super().__init__(API_CONFIGS[APIType.IEEE])
+        self._static_params = urllib.parse.urlencode({"apikey": self.api_key})
+        # Parámetros de filtros ya codificados, por combinación de filtros
+        self._filter_params_cache: Dict[Tuple, str] = {}
+    
+    def authenticate(self) -> bool:
+        """Obtiene la API key y precodifica el parámetro apikey (constante por sesión)."""
+        authenticated = super().authenticate()
+        self._static_params = urllib.parse.urlencode({"apikey": self.api_key})
+        return authenticated
     
     def build_query_url(self, query: str, filters: SearchFilters,
                         max_records: int = 1, start: int = 1) -> str:
         """Construye la URL de búsqueda para IEEE."""
         params = {
-            "apikey": self.api_key,
             "querytext": query,
             "max_records": str(min(max_records, self.config.max_per_request)),
             "start_record": str(start if start > 0 else 1),
         }
         
-        # Filtros de años
-        if filters.year_from:
-            params["start_year"] = str(filters.year_from)
-        if filters.year_to:
-            params["end_year"] = str(filters.year_to)
-        
-        # Filtros específicos de IEEE
+        return (f"{self.config.base_url}?{self._static_params}&{urllib.parse.urlencode(params)}"
+                f"{self._filter_params(filters)}")
+    
+    def _filter_params(self, filters: SearchFilters) -> str:
+        """Retorna los parámetros de filtros codificados ('&...' o ''), una vez por combinación de filtros."""
+        content_type = None
         if isinstance(filters, IEEEFilters) and filters.content_types:
-            params["content_type"] = filters.content_types[0]  # IEEE solo acepta uno
+            content_type = filters.content_types[0]  # IEEE solo acepta uno
+        key = (filters.year_from, filters.year_to, content_type)
         
-        return f"{self.config.base_url}?{urllib.parse.urlencode(params)}"
+        encoded = self._filter_params_cache.get(key)
+        if encoded is None:
+            params = {}
+            # Filtros de años
+            if filters.year_from:
+                params["start_year"] = str(filters.year_from)
+            if filters.year_to:
+                params["end_year"] = str(filters.year_to)
+            # Filtros específicos de IEEE
+            if content_type:
+                params["content_type"] = content_type
+            encoded = "&" + urllib.parse.urlencode(params) if params else ""
+            self._filter_params_cache[key] = encoded
+        return encoded
     
     def parse_total_results(self, response: Dict[str, Any]) -> int:
         """Extrae el total de resultados de la respuesta de IEEE."""
@@ -59,12 +83,7 @@ class IEEEAPIClient(BaseAPIClient):
     
     def extract_document_titles(self, entries: List[Dict[str, Any]]) -> List[str]:
         """Extrae los títulos de los documentos de IEEE."""
-        titles = []
-        for entry in entries:
-            title = entry.get('title', '')
-            if title:
-                titles.append(title)
-        return titles
+        return [title for entry in entries if (title := entry.get('title', ''))]
     
     def _get_headers(self) -> Optional[Dict[str, str]]:
         """IEEE usa API key en URL, no necesita headers especiales."""
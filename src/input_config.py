@@ -6,13 +6,17 @@ import os
 import sys
 import json
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from .config import INPUT_FILE, DEFINITIONS_DIR
 from .models import ScopusFilters, IEEEFilters, WOSFilters
 from .logger import logger
 
 
+# Configuraciones ya cargadas, indexadas por (ruta, mtime del archivo)
+_CACHE: Dict[Tuple[str, float], "InputConfig"] = {}
+
+
 @dataclass
 class InputConfig:
     """Configuración de entrada unificada."""
@@ -25,12 +29,21 @@ class InputConfig:
     
     @classmethod
     def load(cls, filepath: str = INPUT_FILE) -> "InputConfig":
-        """Carga la configuración desde archivo JSON."""
+        """
+        Carga la configuración desde archivo JSON.
+        
+        El resultado se reutiliza mientras el archivo no cambie (mismo mtime).
+        """
         if not os.path.exists(filepath):
             cls._create_example(filepath)
             logger.write(f"Archivo {filepath} creado. Edítalo y vuelve a ejecutar.")
             sys.exit(1)
         
+        cache_key = (filepath, os.path.getmtime(filepath))
+        cached = _CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        
         with open(filepath, "r", encoding="utf-8") as f:
             data = json.load(f)
         
@@ -67,7 +80,7 @@ class InputConfig:
             sort_field=wos_data.get("sort_field", "LD+D"),
         )
         
-        return cls(
+        config = cls(
             keywords=keywords,
             year_from=year_from,
             year_to=year_to,
@@ -75,6 +88,13 @@ class InputConfig:
             ieee=ieee_filters,
             wos=wos_filters,
         )
+        _CACHE[cache_key] = config
+        return config
+    
+    @staticmethod
+    def invalidate() -> None:
+        """Descarta las configuraciones cargadas para forzar la relectura."""
+        _CACHE.clear()
     
     @staticmethod
     def _create_example(filepath: str) -> None:
@@ -3,40 +3,76 @@ Sistema de logging para el proyecto.
 """
 
 import os
+import signal
+import sys
+import threading
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Optional
+from typing import IO, Optional, Set, Tuple
 
 from .config import LOG_DIR
 
 
+# Tamaño del buffer del archivo de log: se escribe a disco en bloques, no por línea
+LOG_BUFFER_SIZE = 64 * 1024
+
+
 class Logger:
-    """Manejador de logs con soporte para archivo y consola."""
+    """
+    Manejador de logs con soporte para archivo y consola.
+    
+    El archivo de log activo se guarda en una ContextVar: cuando varias APIs
+    se ejecutan a la vez (una por hilo), cada una escribe en su propio
+    archivo. Los hilos auxiliares heredan el archivo si se ejecutan con el
+    contexto del hilo que los lanza (ver BaseAPIClient._map_in_context).
+    """
     
     def __init__(self):
-        self._file_handle = None
-        self._filename: Optional[str] = None
+        self._current: ContextVar[Optional[Tuple[str, IO[str]]]] = ContextVar("log_file", default=None)
+        # Prefijo de las líneas en consola (p. ej. "[SCOPUS] " con varias APIs a la vez)
+        self._console_prefix: ContextVar[str] = ContextVar("console_prefix", default="")
+        self._open_handles: Set[IO[str]] = set()
+        # RLock: una señal puede llegar mientras el hilo principal tiene el candado
+        self._lock = threading.RLock()
+        self._sigint_installed = False
+        self.interrupted = False
     
     def init(self, api_name: str, mode: str) -> str:
         """Inicializa el archivo de log con timestamp."""
         if not os.path.exists(LOG_DIR):
-            os.makedirs(LOG_DIR)
+            os.makedirs(LOG_DIR, exist_ok=True)
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self._filename = f"{LOG_DIR}/{api_name}_{mode}_{timestamp}.log"
-        self._file_handle = open(self._filename, "w", encoding="utf-8")
+        filename = f"{LOG_DIR}/{api_name}_{mode}_{timestamp}.log"
+        file_handle = open(filename, "w", encoding="utf-8", buffering=LOG_BUFFER_SIZE)
+        with self._lock:
+            self._open_handles.add(file_handle)
+        self._current.set((filename, file_handle))
+        self.install_sigint_handler()
         
         self.header(f"{api_name.upper()} API LOG - Modo: {mode}")
         self.write(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         self.separator()
         
-        return self._filename
+        return filename
     
     def write(self, message: str) -> None:
         """Escribe mensaje a consola y archivo."""
-        print(message)
-        if self._file_handle:
-            self._file_handle.write(message + "\n")
-            self._file_handle.flush()
+        # Una sola cadena con el salto de línea: una escritura por destino
+        line = message + "\n"
+        prefix = self._console_prefix.get()
+        if prefix:
+            # Cada línea lleva el prefijo para distinguir las APIs intercaladas
+            sys.stdout.write(prefix + message.replace("\n", "\n" + prefix) + "\n")
+        else:
+            sys.stdout.write(line)
+        current = self._current.get()
+        if current:
+            current[1].write(line)
+    
+    def set_console_prefix(self, prefix: str) -> None:
+        """Fija el prefijo de consola del contexto actual (el archivo de log no lo lleva)."""
+        self._console_prefix.set(prefix)
     
     def separator(self, char: str = "=", length: int = 80) -> None:
         """Escribe una línea separadora."""
@@ -49,15 +85,48 @@ class Logger:
         self.write(f"  {title}")
         self.separator()
     
+    def flush(self) -> None:
+        """Escribe a disco el contenido pendiente de todos los archivos de log abiertos."""
+        sys.stdout.flush()
+        with self._lock:
+            handles = list(self._open_handles)
+        for file_handle in handles:
+            file_handle.flush()
+    
     def close(self) -> None:
-        """Cierra el archivo de log."""
-        if self._file_handle:
-            self._file_handle.close()
-            self._file_handle = None
+        """Cierra el archivo de log del contexto actual (vaciando el buffer)."""
+        current = self._current.get()
+        if current:
+            with self._lock:
+                self._open_handles.discard(current[1])
+            current[1].close()
+            self._current.set(None)
+    
+    def install_sigint_handler(self) -> None:
+        """Marca la ejecución como interrumpida con Ctrl+C y relanza la interrupción.
+        
+        El manejador no escribe nada: vaciar stdout o los logs desde una señal
+        puede fallar con "reentrant call". El vaciado lo hacen los bloques
+        finally que cierran el motor de búsqueda.
+        """
+        if self._sigint_installed or threading.current_thread() is not threading.main_thread():
+            return
+        previous = signal.getsignal(signal.SIGINT)
+        
+        def handler(signum, frame):
+            self.interrupted = True
+            if callable(previous):
+                previous(signum, frame)
+            else:
+                raise KeyboardInterrupt
+        
+        signal.signal(signal.SIGINT, handler)
+        self._sigint_installed = True
     
     @property
     def filename(self) -> Optional[str]:
-        return self._filename
+        current = self._current.get()
+        return current[0] if current else None
 
 
 # Logger global (singleton)
@@ -18,7 +18,7 @@ class APIType(Enum):
     WOS = "wos"
 
 
-@dataclass
+@dataclass(slots=True)
 class APIConfig:
     """Configuración específica de una API."""
     api_type: APIType
@@ -27,33 +27,35 @@ class APIConfig:
     max_per_request: int
     output_counts_file: str
     output_results_file: str
+    output_progress_file: str
+    rate_per_minute: float  # Requests por minuto permitidos por la API
 
 
 # =============================================================================
 # FILTROS DE BÚSQUEDA
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class SearchFilters:
     """Filtros de búsqueda comunes."""
     year_from: Optional[int] = None
     year_to: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ScopusFilters(SearchFilters):
     """Filtros específicos de Scopus."""
     doc_types: List[str] = field(default_factory=list)
     subject_areas: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class IEEEFilters(SearchFilters):
     """Filtros específicos de IEEE."""
     content_types: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class WOSFilters(SearchFilters):
     """Filtros específicos de Web of Science."""
     database: str = "WOS"  # WOS, BIOABS, BCI, BIOSIS, CCC, DIIDW, DRCI, MEDLINE, ZOOREC, WOK
@@ -66,7 +68,7 @@ class WOSFilters(SearchFilters):
 # RESULTADOS DE BÚSQUEDA
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     """Resultado de una búsqueda individual."""
     keyword: str
@@ -75,7 +77,7 @@ class SearchResult:
     error: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class CombinationResult:
     """Resultado de una combinación de keywords."""
     keywords: List[str]
@@ -0,0 +1,56 @@
+"""
+Búsqueda simultánea en varias APIs.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+from .config import APIType
+from .models import SearchFilters
+from .base_client import BaseAPIClient
+
+
+def search_all_apis(clients: Dict[APIType, BaseAPIClient], query: str,
+                    filters_by_api: Dict[APIType, SearchFilters],
+                    max_records: int = 25) -> Dict[APIType, Dict[str, Any]]:
+    """
+    Ejecuta la misma búsqueda en todas las APIs a la vez.
+    
+    Cada API está en un host distinto con su propio rate limit, por lo que
+    el tiempo total es el de la API más lenta y no la suma de todas. Los
+    hilos heredan el contexto del que llama (log y prefijo de consola).
+    
+    Args:
+        clients: Clientes autenticados por tipo de API
+        query: Query de búsqueda
+        filters_by_api: Filtros a usar con cada API
+        max_records: Registros por API
+    
+    Returns:
+        Diccionario {APIType: respuesta}
+    """
+    def run(item):
+        api, client = item
+        return client.search(query, filters_by_api[api],
+                             max_records=max_records, verbose=False)
+    
+    with ThreadPoolExecutor(max_workers=max(1, len(clients))) as pool:
+        results = BaseAPIClient._map_in_context(pool, run, clients.items())
+        return dict(zip(clients, results))
+
+
+def count_all_apis(clients: Dict[APIType, BaseAPIClient], query: str,
+                   filters_by_api: Dict[APIType, SearchFilters]) -> Dict[APIType, int]:
+    """
+    Cuenta los resultados de la misma query en todas las APIs a la vez.
+    
+    Returns:
+        Diccionario {APIType: total} (-1 si hubo error en esa API)
+    """
+    def run(item):
+        api, client = item
+        return client.count_results(query, filters_by_api[api])
+    
+    with ThreadPoolExecutor(max_workers=max(1, len(clients))) as pool:
+        results = BaseAPIClient._map_in_context(pool, run, clients.items())
+        return dict(zip(clients, results))
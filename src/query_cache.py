@@ -0,0 +1,104 @@
+"""
+Caché de conteos de resultados por (API, query, filtros).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from typing import Dict, Optional, Tuple
+
+from .config import QUERY_CACHE_FILE, QUERY_CACHE_TTL
+from .models import SearchFilters
+
+
+class QueryCache:
+    """
+    Guarda el total de resultados de cada query durante QUERY_CACHE_TTL.
+    
+    Las ejecuciones repetidas (mismas keywords y filtros) reutilizan los
+    conteos sin volver a consultar la API. Las entradas vigentes se
+    mantienen también en memoria para evitar lecturas repetidas del disco.
+    """
+    
+    def __init__(self, filepath: str = QUERY_CACHE_FILE, ttl: float = QUERY_CACHE_TTL):
+        self.filepath = filepath
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._memory: Dict[Tuple[str, str, str], Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, api: str, query: str, filters: SearchFilters) -> Optional[int]:
+        """Retorna el conteo vigente de la query, o None si no está en caché."""
+        key = self.key(api, query, filters)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                entry = self._connect().execute(
+                    "SELECT count, stored_at FROM counts WHERE api = ? AND query = ? AND filters = ?",
+                    key,
+                ).fetchone()
+                if entry is None:
+                    return None
+                self._memory[key] = entry
+        count, stored_at = entry
+        if now - stored_at > self.ttl:
+            return None
+        return count
+    
+    def set(self, api: str, query: str, filters: SearchFilters, count: int) -> None:
+        """Guarda (o reemplaza) el conteo de la query."""
+        key = self.key(api, query, filters)
+        stored_at = time.time()
+        with self._lock:
+            self._memory[key] = (count, stored_at)
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO counts (api, query, filters, count, stored_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                key + (count, stored_at),
+            )
+            conn.commit()
+    
+    def clear(self) -> None:
+        """Elimina todos los conteos guardados."""
+        with self._lock:
+            self._memory.clear()
+            conn = self._connect()
+            conn.execute("DELETE FROM counts")
+            conn.commit()
+    
+    def close(self) -> None:
+        """Cierra la conexión a la base de datos."""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            dir_path = os.path.dirname(self.filepath)
+            if dir_path and not os.path.exists(dir_path):
+                os.makedirs(dir_path)
+            self._conn = sqlite3.connect(self.filepath, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS counts ("
+                "api TEXT NOT NULL, query TEXT NOT NULL, filters TEXT NOT NULL, "
+                "count INTEGER NOT NULL, stored_at REAL NOT NULL, "
+                "PRIMARY KEY (api, query, filters))"
+            )
+        return self._conn
+    
+    @staticmethod
+    def key(api: str, query: str, filters: SearchFilters) -> Tuple[str, str, str]:
+        """Clave canónica (api, query normalizada, filtros serializados) de un conteo."""
+        # Los filtros se canonicalizan (clases distintas con los mismos campos no colisionan)
+        filters_key = json.dumps([type(filters).__name__, asdict(filters)], sort_keys=True)
+        return (api, query.strip(), filters_key)
+
+
+# Caché global compartida por todos los clientes
+query_cache = QueryCache()
@@ -0,0 +1,116 @@
+"""
+Limitador de tasa (token bucket) por host.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+from .config import DEFAULT_RATE_PER_MINUTE
+
+
+# Ventana máxima (segundos) de un rate limit para usarla como ritmo
+MAX_RATE_WINDOW = 60
+
+
+@dataclass
+class _Bucket:
+    """Estado del token bucket de un host."""
+    rate_per_minute: float
+    # Ritmo configurado (límite contractual): los headers nunca lo superan
+    configured_rate: float
+    tokens: float
+    last_refill: float
+
+
+class HostRateLimiter:
+    """
+    Token bucket por host, con ritmo ajustable según los headers de rate limit.
+    
+    Antes de cada request se llama a acquire(url), que bloquea lo necesario
+    para no superar el ritmo del host. Tras cada respuesta, update(url, headers)
+    recalcula el ritmo a partir de X-RateLimit-Remaining / X-RateLimit-Reset
+    para repartir el cupo restante hasta el reinicio de la ventana (solo para
+    ventanas cortas; las cuotas diarias o semanales se ignoran). El ritmo
+    resultante nunca supera el fijado con set_rate.
+    """
+    
+    def __init__(self, default_rate_per_minute: float = DEFAULT_RATE_PER_MINUTE):
+        self.default_rate_per_minute = default_rate_per_minute
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+    
+    def set_rate(self, host: str, rate_per_minute: float) -> None:
+        """Fija el ritmo de un host (requests por minuto)."""
+        with self._lock:
+            bucket = self._get_bucket(host)
+            bucket.rate_per_minute = rate_per_minute
+            bucket.configured_rate = rate_per_minute
+    
+    def acquire(self, url: str) -> None:
+        """Bloquea hasta que haya un token disponible para el host de la URL."""
+        host = urlparse(url).netloc
+        while True:
+            with self._lock:
+                bucket = self._get_bucket(host)
+                self._refill(bucket)
+                if bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    return
+                wait = (1 - bucket.tokens) * 60.0 / bucket.rate_per_minute
+            time.sleep(wait)
+    
+    def update(self, url: str, headers: Mapping[str, str]) -> None:
+        """Ajusta el ritmo del host según los headers de rate limit de la respuesta."""
+        remaining = self._parse_number(headers.get("X-RateLimit-Remaining"))
+        reset = self._parse_number(headers.get("X-RateLimit-Reset"))
+        if remaining is None or not reset:
+            return
+        
+        # Reset puede venir como epoch o como segundos restantes
+        seconds = reset - time.time() if reset > 1e9 else reset
+        if seconds <= 0 or seconds > MAX_RATE_WINDOW:
+            # Las cuotas de ventana larga (diarias/semanales) no marcan el ritmo
+            return
+        
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._get_bucket(host)
+            self._refill(bucket)
+            # Repartir el cupo restante hasta el reinicio de la ventana, sin
+            # superar el ritmo configurado para el host
+            bucket.rate_per_minute = min(max(remaining, 1) * 60.0 / seconds,
+                                         bucket.configured_rate)
+            if remaining <= 0:
+                # Cupo agotado: el próximo token llega al reiniciarse la ventana
+                bucket.tokens = min(bucket.tokens, 0.0)
+    
+    def _get_bucket(self, host: str) -> _Bucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = _Bucket(rate_per_minute=self.default_rate_per_minute,
+                             configured_rate=self.default_rate_per_minute,
+                             tokens=1.0, last_refill=time.monotonic())
+            self._buckets[host] = bucket
+        return bucket
+    
+    @staticmethod
+    def _refill(bucket: _Bucket) -> None:
+        now = time.monotonic()
+        elapsed = now - bucket.last_refill
+        bucket.last_refill = now
+        # Capacidad de 1 token: el ritmo es uniforme, sin ráfagas
+        bucket.tokens = min(1.0, bucket.tokens + elapsed * bucket.rate_per_minute / 60.0)
+    
+    @staticmethod
+    def _parse_number(value: Optional[str]) -> Optional[float]:
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+
+# Limitador global compartido por todos los clientes
+rate_limiter = HostRateLimiter()
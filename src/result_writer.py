@@ -0,0 +1,83 @@
+"""
+Escritor en segundo plano de resultados parciales (NDJSON).
+"""
+
+import json
+import os
+import queue
+import threading
+from dataclasses import asdict, is_dataclass
+from typing import Any, Optional
+
+try:
+    # orjson serializa dataclasses (incluidas las de slots) sin convertirlas a dict
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    def _dumps_line(item: Any) -> bytes:
+        """Serializa un resultado como una línea NDJSON."""
+        return orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE)
+else:
+    def _default(obj: Any) -> Any:
+        if is_dataclass(obj):
+            return asdict(obj)
+        raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+    def _dumps_line(item: Any) -> bytes:
+        """Serializa un resultado como una línea NDJSON."""
+        return (json.dumps(item, ensure_ascii=False, default=_default) + "\n").encode("utf-8")
+
+
+class ResultWriter:
+    """
+    Escribe resultados en un archivo NDJSON desde un hilo dedicado.
+
+    El bucle de requests solo encola cada resultado (dict o dataclass de
+    models); la serialización y la escritura a disco ocurren en el hilo
+    escritor. Cada línea se vacía a disco
+    al escribirse, de modo que el archivo conserva el progreso si la ejecución
+    se interrumpe.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._queue: "queue.Queue[Optional[Any]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ResultWriter":
+        """Inicia el hilo escritor."""
+        dir_path = os.path.dirname(self.filepath)
+        if dir_path and not os.path.exists(dir_path):
+            os.makedirs(dir_path)
+
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def put(self, item: Any) -> None:
+        """Encola un resultado para escribirlo."""
+        self._queue.put(item)
+
+    def close(self) -> None:
+        """Señala el fin de los resultados y espera a que se escriban todos."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        """Bucle del hilo escritor: consume la cola hasta recibir None."""
+        with open(self.filepath, "wb") as f:
+            for item in iter(self._queue.get, None):
+                f.write(_dumps_line(item))
+                f.flush()
+
+    def __enter__(self) -> "ResultWriter":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
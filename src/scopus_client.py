@@ -3,7 +3,7 @@ Cliente para la API de Scopus (Elsevier).
 """
 
 import urllib.parse
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .config import API_CONFIGS, APIType
 from .models import SearchFilters, ScopusFilters
@@ -13,6 +13,9 @@ from .base_client import BaseAPIClient
 class ScopusAPIClient(BaseAPIClient):
     """Cliente para la API de Scopus (Elsevier)."""
     
+    # Ruta de las entradas en la respuesta de búsqueda
+    ENTRIES_PATH = "search-results.entry.item"
+    
     # Tipos de documento válidos
     DOC_TYPES = {
         "ar": "Article",
@@ -42,6 +45,13 @@ class ScopusAPIClient(BaseAPIClient):
     
     def __init__(self):
         super().__init__(API_CONFIGS[APIType.SCOPUS])
+        # Parámetros constantes en todas las búsquedas, codificados una sola vez
+        self._static_params = urllib.parse.urlencode({
+            "view": "STANDARD",
+            "sort": "-citedby-count",
+        })
+        # Prefijo/sufijo de query ya calculados, por combinación de filtros
+        self._affix_cache: Dict[Tuple, Tuple[str, str]] = {}
     
     def build_query_url(self, query: str, filters: SearchFilters,
                         max_records: int = 1, start: int = 0) -> str:
@@ -52,37 +62,73 @@ class ScopusAPIClient(BaseAPIClient):
             "query": full_query,
             "count": str(min(max_records, self.config.max_per_request)),
             "start": str(start),
-            "view": "STANDARD",
-            "sort": "-citedby-count",
         }
         
-        return f"{self.config.base_url}?{urllib.parse.urlencode(params)}"
+        return f"{self.config.base_url}?{urllib.parse.urlencode(params)}&{self._static_params}"
     
     def _build_full_query(self, query: str, filters: SearchFilters) -> str:
-        """Construye la query completa con filtros para Scopus."""
-        full_query = query
+        """
+        Construye la query completa con filtros para Scopus.
+        
+        Los filtros se traducen una sola vez a un prefijo y un sufijo que
+        envuelven la query (ver _filter_affixes).
+        """
+        prefix, suffix = self._filter_affixes(filters)
+        return prefix + query + suffix
+    
+    def _filter_affixes(self, filters: SearchFilters) -> Tuple[str, str]:
+        """Retorna (prefijo, sufijo) de los filtros, calculados una vez por combinación de filtros."""
+        if isinstance(filters, ScopusFilters):
+            key = (filters.year_from, filters.year_to,
+                   tuple(filters.doc_types or ()), tuple(filters.subject_areas or ()))
+        else:
+            key = (filters.year_from, filters.year_to, (), ())
+        
+        affixes = self._affix_cache.get(key)
+        if affixes is None:
+            affixes = self._build_filter_affixes(*key)
+            self._affix_cache[key] = affixes
+        return affixes
+    
+    @staticmethod
+    def _build_filter_affixes(year_from: Optional[int], year_to: Optional[int],
+                              doc_types: Tuple[str, ...],
+                              subject_areas: Tuple[str, ...]) -> Tuple[str, str]:
+        """
+        Calcula el prefijo y sufijo que agregan los filtros alrededor de la query.
+        
+        Cada filtro envuelve lo anterior entre paréntesis y agrega su condición:
+        ((query) AND PUBYEAR ...) AND (DOCTYPE(...)) AND ...
+        """
+        prefix = ""
+        suffix = ""
         
         # Filtro de años
-        if filters.year_from and filters.year_to:
-            full_query = f"({query}) AND PUBYEAR > {filters.year_from - 1} AND PUBYEAR < {filters.year_to + 1}"
-        elif filters.year_from:
-            full_query = f"({query}) AND PUBYEAR > {filters.year_from - 1}"
-        elif filters.year_to:
-            full_query = f"({query}) AND PUBYEAR < {filters.year_to + 1}"
+        if year_from and year_to:
+            year_filter = f" AND PUBYEAR > {year_from - 1} AND PUBYEAR < {year_to + 1}"
+        elif year_from:
+            year_filter = f" AND PUBYEAR > {year_from - 1}"
+        elif year_to:
+            year_filter = f" AND PUBYEAR < {year_to + 1}"
+        else:
+            year_filter = ""
+        if year_filter:
+            prefix = "("
+            suffix = ")" + year_filter
         
-        # Filtros específicos de Scopus
-        if isinstance(filters, ScopusFilters):
-            # Tipos de documento
-            if filters.doc_types:
-                doc_filter = " OR ".join([f"DOCTYPE({dt})" for dt in filters.doc_types])
-                full_query = f"({full_query}) AND ({doc_filter})"
-            
-            # Áreas temáticas
-            if filters.subject_areas:
-                area_filter = " OR ".join([f"SUBJAREA({sa})" for sa in filters.subject_areas])
-                full_query = f"({full_query}) AND ({area_filter})"
+        # Tipos de documento
+        if doc_types:
+            doc_filter = " OR ".join([f"DOCTYPE({dt})" for dt in doc_types])
+            prefix = "(" + prefix
+            suffix = f"{suffix}) AND ({doc_filter})"
+        
+        # Áreas temáticas
+        if subject_areas:
+            area_filter = " OR ".join([f"SUBJAREA({sa})" for sa in subject_areas])
+            prefix = "(" + prefix
+            suffix = f"{suffix}) AND ({area_filter})"
         
-        return full_query
+        return prefix, suffix
     
     def parse_total_results(self, response: Dict[str, Any]) -> int:
         """Extrae el total de resultados de la respuesta de Scopus."""
@@ -100,12 +146,7 @@ class ScopusAPIClient(BaseAPIClient):
     
     def extract_document_titles(self, entries: List[Dict[str, Any]]) -> List[str]:
         """Extrae los títulos de los documentos de Scopus."""
-        titles = []
-        for entry in entries:
-            title = entry.get('dc:title', '')
-            if title:
-                titles.append(title)
-        return titles
+        return [title for entry in entries if (title := entry.get('dc:title', ''))]
     
     def _get_headers(self) -> Optional[Dict[str, str]]:
         """Retorna headers específicos de Scopus."""
@@ -4,17 +4,26 @@ search_engine.py - Motor de búsqueda para Literature Review
 """
 
 import os
+import contextvars
+import hashlib
+import heapq
 import itertools
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from math import comb
+from operator import attrgetter
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Any
 import json
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 
 from .config import (
-    APIType, API_CONFIGS, OUTPUTS_DIR, CONSOLIDATED_OUTPUT_PREFIX
+    APIType, API_CONFIGS, OUTPUTS_DIR, CONSOLIDATED_OUTPUT_PREFIX, CHECKPOINT_PREFIX,
+    PAIR_PREFILTER_MIN_KEYWORDS,
 )
 from .models import (
     SearchFilters, ScopusFilters, IEEEFilters, WOSFilters,
@@ -22,7 +31,37 @@ from .models import (
 )
 from .logger import logger
 from .base_client import BaseAPIClient
+from .http_client import HTTPClient
+from .query_cache import query_cache
 from .input_config import InputConfig
+from .result_writer import ResultWriter
+
+try:
+    # orjson serializa varias veces más rápido y escribe UTF-8 directamente
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_json(data: Any, filepath: str) -> None:
+    """Guarda data como JSON indentado (2 espacios, UTF-8 sin escapar)."""
+    if orjson is not None:
+        with open(filepath, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+# Clave de orden por número de resultados
+_count_of = attrgetter("count")
+
+# Formatos de las filas de las tablas (se reutilizan en cada fila)
+_KEYWORD_ROW_FMT = "{:<50} | {:>15,}"
+_TOP30_ROW_FMT = "{:<6} | {:>12,} | {:<25} | {:<25} | {:<25}"
+_SEP_70 = "-" * 70
+_SEP_80 = "=" * 80
+_SEP_102 = "-" * 102
 
 
 class SearchEngine:
@@ -31,6 +70,8 @@ class SearchEngine:
     def __init__(self):
         self.clients: Dict[APIType, BaseAPIClient] = {}
         self.config: Optional[InputConfig] = None
+        # Señal de parada para las búsquedas que corren en hilos (Ctrl+C)
+        self._stop = threading.Event()
     
     def register_client(self, api_type: APIType, client: BaseAPIClient) -> bool:
         """Registra un cliente de API si está autenticado correctamente."""
@@ -47,6 +88,12 @@ class SearchEngine:
         self.config = InputConfig.load()
         return self.config is not None
     
+    def close(self) -> None:
+        """Libera las conexiones HTTP y las cachés en disco al terminar."""
+        HTTPClient.close()
+        query_cache.close()
+        logger.flush()
+    
     def run_simple_mode(self, api_type: APIType) -> Tuple[int, List[CombinationResult]]:
         """
         Ejecuta el modo sencillo (conteo de publicaciones).
@@ -73,9 +120,14 @@ class SearchEngine:
         # Mostrar configuración
         self._print_config(api_type, filters)
         
-        # Ejecutar búsquedas
-        individual_results = self._search_individual(client, filters)
-        combination_results = self._search_combinations(client, filters)
+        # Ejecutar búsquedas (los resultados parciales se escriben en segundo plano)
+        writer = ResultWriter(API_CONFIGS[api_type].output_progress_file).start()
+        try:
+            individual_results = self._search_individual(client, filters, writer)
+            combination_results = self._search_combinations(client, filters, writer,
+                                                            individual_results)
+        finally:
+            writer.close()
         
         # Guardar resultados
         self._save_results(api_type, individual_results, combination_results)
@@ -83,6 +135,61 @@ class SearchEngine:
         logger.close()
         return (0, combination_results)
     
+    def run_simple_mode_all(self, parallel: bool = True) -> Tuple[int, Dict[APIType, List[CombinationResult]]]:
+        """
+        Ejecuta el modo sencillo para todas las APIs registradas.
+        
+        Cada API está en un host distinto con su propio rate limit, así que se
+        ejecutan en hilos separados: el tiempo total es el de la API más lenta.
+        Cada hilo corre en su propio contexto, por lo que cada API conserva su
+        archivo de log; en consola cada línea lleva el nombre de su API.
+        
+        Con Ctrl+C se activa la señal de parada: cada API deja de pedir
+        conteos (el checkpoint permite reanudar) y la interrupción se propaga
+        al terminar los requests en curso. Con parallel=False, o con una sola
+        API, se ejecutan una tras otra en el hilo actual.
+        
+        Returns:
+            Tupla (código_retorno, {APIType: lista_combinaciones}) con las APIs exitosas
+        """
+        if not parallel or len(self.clients) <= 1:
+            outcomes = {api_type: self.run_simple_mode(api_type) for api_type in list(self.clients)}
+        else:
+            logger.install_sigint_handler()
+            self._stop.clear()
+            pool = ThreadPoolExecutor(max_workers=len(self.clients))
+            try:
+                futures = {
+                    api_type: pool.submit(contextvars.copy_context().run, self._run_simple_mode_tagged, api_type)
+                    for api_type in self.clients
+                }
+                outcomes = {api_type: future.result() for api_type, future in futures.items()}
+            except KeyboardInterrupt:
+                logger.write("\nInterrumpido: deteniendo las búsquedas en curso...")
+                self._stop.set()
+                raise
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+        
+        result = 0
+        all_results = {}
+        for api_type, (ret, combinations) in outcomes.items():
+            if ret != 0:
+                result = ret
+            else:
+                all_results[api_type] = combinations
+        return (result, all_results)
+    
+    def _run_simple_mode_tagged(self, api_type: APIType) -> Tuple[int, List[CombinationResult]]:
+        """run_simple_mode con las líneas de consola prefijadas con el nombre de la API."""
+        logger.set_console_prefix(f"[{api_type.value.upper()}] ")
+        return self.run_simple_mode(api_type)
+    
+    def _check_stop(self) -> None:
+        """Interrumpe la búsqueda del hilo actual si se pidió parar (Ctrl+C)."""
+        if self._stop.is_set():
+            raise KeyboardInterrupt
+    
     def _get_filters_for_api(self, api_type: APIType) -> SearchFilters:
         """Obtiene los filtros específicos para una API."""
         if api_type == APIType.SCOPUS:
@@ -98,8 +205,9 @@ class SearchEngine:
         logger.header("CONFIGURACIÓN CARGADA")
         logger.write(f"Archivo: definitions/input.json")
         logger.write(f"Keywords: {len(self.config.keywords)}")
+        write = logger.write
         for i, kw in enumerate(self.config.keywords, 1):
-            logger.write(f"  {i}. {kw}")
+            write(f"  {i}. {kw}")
         
         logger.write(f"\nFiltros:")
         logger.write(f"  Años: {filters.year_from or 'Sin límite'} - {filters.year_to or 'Sin límite'}")
@@ -115,37 +223,55 @@ class SearchEngine:
             logger.write(f"  Tipos de documento: {', '.join(filters.document_types) if filters.document_types else 'Todos'}")
     
     def _search_individual(self, client: BaseAPIClient, 
-                           filters: SearchFilters) -> List[SearchResult]:
+                           filters: SearchFilters,
+                           writer: Optional[ResultWriter] = None) -> List[SearchResult]:
         """Realiza búsqueda individual por keyword."""
         logger.header("RESULTADOS INDIVIDUALES")
         logger.write(f"{'Keyword':<50} | {'Publicaciones':>15}")
-        logger.write("-" * 70)
+        logger.write(_SEP_70)
         
         results = []
         total = 0
         
-        for keyword in self.config.keywords:
-            query = f'"{keyword}"'
-            count = client.count_results(query, filters)
-            
+        # Los conteos se piden en paralelo (el rate limiter marca el ritmo)
+        keywords = self.config.keywords
+        queries = [f'"{keyword}"' for keyword in keywords]
+        counts = client.count_results_many(queries, filters)
+        self._check_stop()
+        
+        # Referencias locales: el bucle se ejecuta una vez por keyword
+        write = logger.write
+        append = results.append
+        
+        for keyword, query, count in zip(keywords, queries, counts):
             if count == -1:
-                logger.write(f"{keyword:<50} | {'ERROR':>15}")
-                results.append(SearchResult(keyword=keyword, query=query, count=None, error=True))
+                write(f"{keyword:<50} | {'ERROR':>15}")
+                append(SearchResult(keyword=keyword, query=query, count=None, error=True))
             else:
-                logger.write(f"{keyword:<50} | {count:>15,}")
-                results.append(SearchResult(keyword=keyword, query=query, count=count))
+                write(_KEYWORD_ROW_FMT.format(keyword, count))
+                append(SearchResult(keyword=keyword, query=query, count=count))
                 total += count
             
-            time.sleep(0.25)
+            if writer:
+                # SearchResult no se modifica después: se encola tal cual
+                writer.put(results[-1])
         
-        logger.write("-" * 70)
+        logger.write(_SEP_70)
         logger.write(f"{'TOTAL INDIVIDUAL (suma)':<50} | {total:>15,}")
         
         return results
     
     def _search_combinations(self, client: BaseAPIClient,
-                              filters: SearchFilters) -> List[CombinationResult]:
-        """Realiza búsqueda por combinaciones de 3 keywords."""
+                              filters: SearchFilters,
+                              writer: Optional[ResultWriter] = None,
+                              individual: Optional[List[SearchResult]] = None) -> List[CombinationResult]:
+        """
+        Realiza búsqueda por combinaciones de 3 keywords.
+        
+        Una terna que contiene un par de keywords sin resultados en conjunto
+        tiene necesariamente 0 resultados (AND solo restringe), por lo que se
+        registra con count 0 sin consultar la API.
+        """
         keywords = self.config.keywords
         
         if len(keywords) < 3:
@@ -154,38 +280,148 @@ class SearchEngine:
         
         logger.header("COMBINACIONES DE 3 KEYWORDS (TERNAS)")
         
-        combinations = list(itertools.combinations(keywords, 3))
-        logger.write(f"Total de combinaciones posibles: {len(combinations)}")
+        # Las ternas se generan de forma perezosa; el total se calcula sin materializarlas
+        logger.write(f"Total de combinaciones posibles: {comb(len(keywords), 3)}")
         logger.write("")
         
         results = []
         total = 0
         
-        for idx, combo in enumerate(combinations, 1):
-            query = f'"{combo[0]}" AND "{combo[1]}" AND "{combo[2]}"'
-            count = client.count_results(query, filters)
-            
-            display_keywords = f"[{combo[0]}] AND [{combo[1]}] AND [{combo[2]}]"
-            
-            if count == -1:
-                logger.write(f"\n{idx:3}. ERROR")
-                logger.write(f"     Keywords: {display_keywords}")
-                logger.write(f"     Query enviada: {query}")
-                results.append(CombinationResult(keywords=list(combo), query=query, count=None, error=True))
-            else:
-                logger.write(f"\n{idx:3}. Resultados: {count:,}")
-                logger.write(f"     Keywords: {display_keywords}")
-                logger.write(f"     Query enviada: {query}")
-                results.append(CombinationResult(keywords=list(combo), query=query, count=count))
-                total += count
-            
-            time.sleep(0.25)
+        # Reanudar una ejecución interrumpida: los conteos ya obtenidos no se repiden
+        checkpoint_path = self._checkpoint_path(client.config.api_type, keywords, filters)
+        done = self._load_checkpoint(checkpoint_path)
+        if done:
+            logger.write(f"Reanudando: {len(done)} combinaciones ya contadas ({checkpoint_path})")
+            logger.write("")
+        
+        # Ternas con resultado 0 garantizado por un par sin resultados
+        zero_pairs = self._zero_pairs(client, filters, keywords, individual)
+        if zero_pairs:
+            known_zero = sum(1 for combo in itertools.combinations(keywords, 3)
+                             if self._has_zero_pair(combo, zero_pairs))
+            if known_zero:
+                logger.write(f"Combinaciones omitidas (contienen un par sin resultados): {known_zero}")
+                logger.write("")
+        
+        # Las queries se generan de forma perezosa en dos pasadas: una alimenta los
+        # conteos pendientes (en paralelo, con un número acotado de requests en vuelo)
+        # y la otra recorre las combinaciones en orden
+        pending = client.iter_count_results(
+            (q for combo, q in self._triples(keywords)
+             if q not in done and not self._has_zero_pair(combo, zero_pairs)), filters)
+        rows = (
+            (combo, q, done[q] if q in done else 0 if self._has_zero_pair(combo, zero_pairs) else next(pending))
+            for combo, q in self._triples(keywords)
+        )
+        
+        if not os.path.exists(OUTPUTS_DIR):
+            os.makedirs(OUTPUTS_DIR)
+        
+        # Referencias locales: el bucle se ejecuta una vez por combinación
+        write = logger.write
+        append = results.append
+        
+        with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            try:
+                for idx, (combo, query, count) in enumerate(rows, 1):
+                    self._check_stop()
+                    display_keywords = f"[{combo[0]}] AND [{combo[1]}] AND [{combo[2]}]"
+                    
+                    if count == -1:
+                        write(f"\n{idx:3}. ERROR")
+                        write(f"     Keywords: {display_keywords}")
+                        write(f"     Query enviada: {query}")
+                        append(CombinationResult(keywords=list(combo), query=query, count=None, error=True))
+                    else:
+                        write(f"\n{idx:3}. Resultados: {count:,}")
+                        write(f"     Keywords: {display_keywords}")
+                        write(f"     Query enviada: {query}")
+                        append(CombinationResult(keywords=list(combo), query=query, count=count))
+                        total += count
+                        
+                        if query not in done:
+                            checkpoint.write(json.dumps({"q": query, "c": count}, ensure_ascii=False) + "\n")
+                            checkpoint.flush()
+                    
+                    if writer:
+                        # Copia sin documents: se completan después desde otro hilo
+                        r = results[-1]
+                        writer.put({"keywords": r.keywords, "query": r.query, "count": r.count, "error": r.error})
+            finally:
+                # Cancela los conteos pendientes aún no iniciados si el bucle se interrumpe
+                pending.close()
+        
+        # Todas las combinaciones se procesaron: el checkpoint ya no es necesario
+        os.remove(checkpoint_path)
         
         # Mostrar resumen y TOP 30
         self._print_combination_summary(results, total, client, filters)
         
         return results
     
+    @staticmethod
+    def _triples(keywords: List[str]) -> Iterator[Tuple[Tuple[str, str, str], str]]:
+        """Genera (terna, query) para cada combinación de 3 keywords, sin materializarlas."""
+        for combo in itertools.combinations(keywords, 3):
+            yield combo, f'"{combo[0]}" AND "{combo[1]}" AND "{combo[2]}"'
+    
+    @staticmethod
+    def _has_zero_pair(combo: Tuple[str, str, str], zero_pairs: Set[Tuple[str, str]]) -> bool:
+        """True si la terna contiene un par de keywords sin resultados en conjunto."""
+        a, b, c = combo
+        return (a, b) in zero_pairs or (a, c) in zero_pairs or (b, c) in zero_pairs
+    
+    def _zero_pairs(self, client: BaseAPIClient, filters: SearchFilters, keywords: List[str],
+                    individual: Optional[List[SearchResult]]) -> Set[Tuple[str, str]]:
+        """
+        Pares de keywords (en el orden de keywords) sin resultados en conjunto.
+        
+        Los pares con una keyword sin resultados individuales se obtienen sin
+        requests; con PAIR_PREFILTER_MIN_KEYWORDS keywords o más se cuentan
+        además los pares restantes, que son bastantes menos que las ternas.
+        """
+        zero_keywords = {r.keyword for r in individual or () if r.count == 0}
+        pairs = list(itertools.combinations(keywords, 2))
+        zero_pairs = {pair for pair in pairs if pair[0] in zero_keywords or pair[1] in zero_keywords}
+        
+        if len(keywords) >= PAIR_PREFILTER_MIN_KEYWORDS:
+            pairs = [pair for pair in pairs if pair not in zero_pairs]
+            logger.write(f"Contando {len(pairs)} pares de keywords para omitir ternas vacías...")
+            counts = client.iter_count_results([f'"{a}" AND "{b}"' for a, b in pairs], filters)
+            try:
+                for pair, count in zip(pairs, counts):
+                    self._check_stop()
+                    # Un error (-1) no permite descartar la terna
+                    if count == 0:
+                        zero_pairs.add(pair)
+            finally:
+                counts.close()
+        
+        return zero_pairs
+    
+    @staticmethod
+    def _checkpoint_path(api_type: APIType, keywords: List[str], filters: SearchFilters) -> str:
+        """Ruta del checkpoint de combinaciones para estas keywords y filtros."""
+        signature = json.dumps([keywords, type(filters).__name__, asdict(filters)], sort_keys=True)
+        digest = hashlib.sha1(signature.encode("utf-8")).hexdigest()[:12]
+        return f"{CHECKPOINT_PREFIX}_{api_type.value}_{digest}.jsonl"
+    
+    @staticmethod
+    def _load_checkpoint(path: str) -> Dict[str, int]:
+        """Carga los conteos {query: count} de un checkpoint (vacío si no existe)."""
+        done = {}
+        if not os.path.exists(path):
+            return done
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Última línea incompleta si la ejecución se cortó al escribirla
+                    continue
+                done[entry["q"]] = entry["c"]
+        return done
+    
     def _print_combination_summary(self, results: List[CombinationResult], total: int,
                                    client: BaseAPIClient = None, 
                                    filters: SearchFilters = None) -> None:
@@ -194,36 +430,38 @@ class SearchEngine:
         logger.write(f"Total de combinaciones: {len(results)}")
         logger.write(f"Suma de resultados: {total:,}")
         
-        # Filtrar combinaciones con resultados > 0
-        with_results = [r for r in results if r.count and r.count > 0]
-        logger.write(f"Combinaciones con al menos 1 resultado: {len(with_results)}")
+        top_30, _, with_results_count = self._summarize(results)
+        logger.write(f"Combinaciones con al menos 1 resultado: {with_results_count}")
         
-        if with_results:
-            with_results.sort(key=lambda x: x.count or 0, reverse=True)
-            
+        if top_30:
             # Obtener documentos para el TOP 30 si tenemos cliente y filtros
-            top_30 = with_results[:30]
             if client and filters:
                 logger.write("")
                 logger.write("Obteniendo títulos de documentos para el TOP 30...")
-                for idx, r in enumerate(top_30, 1):
-                    titles = client.get_document_titles(r.query, filters, max_docs=200)
-                    r.documents = titles
-                    logger.write(f"  Llave {idx}: {len(titles)} documentos obtenidos")
-                    time.sleep(0.25)
+                # Las 30 llaves se descargan en paralelo (el rate limiter marca el ritmo)
+                titles_iter = client.iter_document_titles([r.query for r in top_30], filters,
+                                                          max_docs=200, stop=self._stop)
+                try:
+                    for idx, (r, titles) in enumerate(zip(top_30, titles_iter), 1):
+                        self._check_stop()
+                        r.documents = titles
+                        logger.write(f"  Llave {idx}: {len(titles)} documentos obtenidos")
+                finally:
+                    # Cancela las llaves aún no iniciadas si el bucle se interrumpe
+                    titles_iter.close()
             
             logger.header("TOP 30 COMBINACIONES CON MÁS RESULTADOS")
             logger.write("")
             logger.write(f"{'Llave':<6} | {'Resultados':>12} | {'Keyword 1':<25} | {'Keyword 2':<25} | {'Keyword 3':<25}")
-            logger.write("-" * 102)
+            logger.write(_SEP_102)
             
+            # Recorte a 24 caracteres con un solo slice por keyword: en un str
+            # más corto el slice retorna el mismo objeto, sin copiarlo
             for i, r in enumerate(top_30, 1):
-                k1 = r.keywords[0][:24] if len(r.keywords[0]) > 24 else r.keywords[0]
-                k2 = r.keywords[1][:24] if len(r.keywords[1]) > 24 else r.keywords[1]
-                k3 = r.keywords[2][:24] if len(r.keywords[2]) > 24 else r.keywords[2]
-                logger.write(f"{i:<6} | {r.count:>12,} | {k1:<25} | {k2:<25} | {k3:<25}")
+                k1, k2, k3 = [k[:24] for k in r.keywords]
+                logger.write(_TOP30_ROW_FMT.format(i, r.count, k1, k2, k3))
             
-            logger.write("-" * 102)
+            logger.write(_SEP_102)
             logger.write("")
             logger.write("Detalle de queries enviadas:")
             for i, r in enumerate(top_30, 1):
@@ -234,25 +472,51 @@ class SearchEngine:
                 logger.header("DOCUMENTOS ENCONTRADOS POR LLAVE (TOP 30)")
                 logger.write("")
                 for i, r in enumerate(top_30, 1):
-                    logger.write(f"{'='*80}")
-                    logger.write(f"LLAVE {i} - {len(r.documents)} documento(s)")
-                    logger.write(f"Keywords: {' AND '.join(r.keywords)}")
-                    logger.write(f"{'='*80}")
-                    if r.documents:
-                        for doc_idx, title in enumerate(r.documents, 1):
-                            display_title = title[:120] + "..." if len(title) > 120 else title
-                            logger.write(f"  {doc_idx:3}. {display_title}")
-                    else:
-                        logger.write("  (Sin documentos recuperados)")
-                    logger.write("")
+                    logger.write(self._format_docs_block(i, r))
+    
+    @staticmethod
+    def _format_docs_block(llave: int, r: CombinationResult, max_title: int = 120) -> str:
+        """Bloque de texto con los documentos de una llave (se escribe de una vez)."""
+        lines = [
+            _SEP_80,
+            f"LLAVE {llave} - {len(r.documents)} documento(s)",
+            f"Keywords: {' AND '.join(r.keywords)}",
+            _SEP_80,
+        ]
+        if r.documents:
+            lines.extend(
+                f"  {doc_idx:3}. {title[:max_title]}{'...' if len(title) > max_title else ''}"
+                for doc_idx, title in enumerate(r.documents, 1)
+            )
+        else:
+            lines.append("  (Sin documentos recuperados)")
+        lines.append("")
+        return "\n".join(lines)
     
-    def _build_documents_by_key(self, combinations: List[CombinationResult]) -> List[Dict[str, Any]]:
-        """Construye la tabla de documentos por llave (TOP 30)."""
-        with_results = [r for r in combinations if r.count and r.count > 0]
-        with_results.sort(key=lambda x: x.count or 0, reverse=True)
+    @staticmethod
+    def _summarize(combinations: List[CombinationResult]) -> Tuple[List[CombinationResult], int, int]:
+        """
+        Resume las combinaciones en una sola pasada.
         
+        Returns:
+            Tupla (top_30, suma_de_resultados, combinaciones_con_resultados);
+            top_30 queda ordenado de mayor a menor número de resultados
+        """
+        with_results = []
+        total = 0
+        for r in combinations:
+            count = r.count or 0
+            total += count
+            if count > 0:
+                with_results.append(r)
+        # Solo interesan las 30 mayores: selección parcial en lugar de ordenar todo
+        top_30 = heapq.nlargest(30, with_results, key=_count_of)
+        return top_30, total, len(with_results)
+    
+    def _build_documents_by_key(self, top_30: List[CombinationResult]) -> List[Dict[str, Any]]:
+        """Construye la tabla de documentos por llave a partir del TOP 30."""
         documents_table = []
-        for i, r in enumerate(with_results[:30], 1):
+        for i, r in enumerate(top_30, 1):
             documents_table.append({
                 "llave": i,
                 "keywords": r.keywords,
@@ -272,7 +536,7 @@ class SearchEngine:
         
         # Calcular totales
         total_individual = sum(r.count or 0 for r in individual)
-        total_combinations = sum(r.count or 0 for r in combinations)
+        top_30, total_combinations, _ = self._summarize(combinations)
         
         output_data = {
             "api": api_type.value,
@@ -299,7 +563,7 @@ class SearchEngine:
                 ],
                 "total": total_combinations,
             },
-            "documents_by_key": self._build_documents_by_key(combinations),
+            "documents_by_key": self._build_documents_by_key(top_30),
         }
         
         # Agregar filtros específicos
@@ -310,8 +574,7 @@ class SearchEngine:
             output_data["filters"]["content_types"] = filters.content_types
         
         # Guardar en carpeta outputs (la ruta ya incluye OUTPUTS_DIR)
-        with open(config.output_counts_file, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        _dump_json(output_data, config.output_counts_file)
         
         logger.header("RESUMEN FINAL")
         logger.write(f"Keywords analizados: {len(self.config.keywords)}")
@@ -339,8 +602,9 @@ class SearchEngine:
         apis_executed = list(all_results.keys())
         apis_names = [api.value for api in apis_executed]
         
-        # Crear workbook
-        wb = Workbook()
+        # Crear workbook en modo write-only: las filas se escriben a medida que
+        # se agregan, sin mantener todas las celdas de cada hoja en memoria
+        wb = Workbook(write_only=True)
         
         # Estilos
         header_font = Font(bold=True, color="FFFFFF")
@@ -352,54 +616,45 @@ class SearchEngine:
             bottom=Side(style='thin')
         )
         
+        def bordered(ws, value) -> WriteOnlyCell:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.border = border
+            return cell
+        
+        def header_row(ws, headers: List[str]) -> List[WriteOnlyCell]:
+            cells = []
+            for header in headers:
+                cell = bordered(ws, header)
+                cell.font = header_font
+                cell.fill = header_fill
+                cell.alignment = Alignment(horizontal='center')
+                cells.append(cell)
+            return cells
+        
         # Hoja de resumen
-        ws_summary = wb.active
-        ws_summary.title = "Resumen"
-        ws_summary['A1'] = "TOP 30 COMBINACIONES - REPORTE CONSOLIDADO"
-        ws_summary['A1'].font = Font(bold=True, size=14)
-        ws_summary['A3'] = "Fecha y hora:"
-        ws_summary['B3'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        ws_summary['A4'] = "APIs ejecutadas:"
-        ws_summary['B4'] = ', '.join(apis_names)
-        ws_summary['A5'] = "Keywords:"
-        ws_summary['B5'] = len(self.config.keywords)
-        ws_summary['A6'] = "Rango de años:"
-        ws_summary['B6'] = f"{self.config.year_from or 'Sin límite'} - {self.config.year_to or 'Sin límite'}"
+        ws_summary = wb.create_sheet(title="Resumen")
+        title_cell = WriteOnlyCell(ws_summary, value="TOP 30 COMBINACIONES - REPORTE CONSOLIDADO")
+        title_cell.font = Font(bold=True, size=14)
+        ws_summary.append([title_cell])
+        ws_summary.append([])
+        ws_summary.append(["Fecha y hora:", datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+        ws_summary.append(["APIs ejecutadas:", ', '.join(apis_names)])
+        ws_summary.append(["Keywords:", len(self.config.keywords)])
+        ws_summary.append(["Rango de años:", f"{self.config.year_from or 'Sin límite'} - {self.config.year_to or 'Sin límite'}"])
+        
+        # TOP 30 de cada API (compartido por las hojas y el resumen en consola)
+        summaries = {api_type: self._summarize(combinations)
+                     for api_type, combinations in all_results.items()}
         
         # Crear hojas por API
-        for api_type, combinations in all_results.items():
+        for api_type, (top_30, _, _) in summaries.items():
             api_name = api_type.value.upper()
             
-            # Filtrar combinaciones con resultados > 0 y ordenar
-            with_results = [r for r in combinations if r.count and r.count > 0]
-            with_results.sort(key=lambda x: x.count or 0, reverse=True)
-            
-            if not with_results:
+            if not top_30:
                 continue
             
-            # Hoja de combinaciones TOP 30
+            # Hoja de combinaciones TOP 30 (los anchos se fijan antes de escribir filas)
             ws_combo = wb.create_sheet(title=f"{api_name}_TOP30")
-            
-            # Headers
-            headers = ["Rank", "Resultados", "Keyword 1", "Keyword 2", "Keyword 3", "Query"]
-            for col, header in enumerate(headers, 1):
-                cell = ws_combo.cell(row=1, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = border
-                cell.alignment = Alignment(horizontal='center')
-            
-            # Datos
-            for i, r in enumerate(with_results[:30], 1):
-                row = i + 1
-                ws_combo.cell(row=row, column=1, value=i).border = border
-                ws_combo.cell(row=row, column=2, value=r.count).border = border
-                ws_combo.cell(row=row, column=3, value=r.keywords[0]).border = border
-                ws_combo.cell(row=row, column=4, value=r.keywords[1]).border = border
-                ws_combo.cell(row=row, column=5, value=r.keywords[2]).border = border
-                ws_combo.cell(row=row, column=6, value=r.query).border = border
-            
-            # Ajustar anchos
             ws_combo.column_dimensions['A'].width = 8
             ws_combo.column_dimensions['B'].width = 12
             ws_combo.column_dimensions['C'].width = 30
@@ -407,53 +662,50 @@ class SearchEngine:
             ws_combo.column_dimensions['E'].width = 30
             ws_combo.column_dimensions['F'].width = 80
             
+            # Headers
+            ws_combo.append(header_row(ws_combo, ["Rank", "Resultados", "Keyword 1", "Keyword 2", "Keyword 3", "Query"]))
+            
+            # Datos
+            for i, r in enumerate(top_30, 1):
+                ws_combo.append([
+                    bordered(ws_combo, value)
+                    for value in (i, r.count, r.keywords[0], r.keywords[1], r.keywords[2], r.query)
+                ])
+            
             # Hoja de documentos
             ws_docs = wb.create_sheet(title=f"{api_name}_Documentos")
+            ws_docs.column_dimensions['A'].width = 8
+            ws_docs.column_dimensions['B'].width = 60
+            ws_docs.column_dimensions['C'].width = 100
+            ws_docs.column_dimensions['D'].width = 12
             
             # Headers documentos
-            doc_headers = ["Llave", "Keywords", "Titulo", "API_Source"]
-            for col, header in enumerate(doc_headers, 1):
-                cell = ws_docs.cell(row=1, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = border
-                cell.alignment = Alignment(horizontal='center')
+            ws_docs.append(header_row(ws_docs, ["Llave", "Keywords", "Titulo", "API_Source"]))
             
             # Datos documentos
-            doc_row = 2
-            for i, r in enumerate(with_results[:30], 1):
+            for i, r in enumerate(top_30, 1):
                 if r.documents:
                     keywords_str = " AND ".join(r.keywords)
                     for title in r.documents:
-                        ws_docs.cell(row=doc_row, column=1, value=i).border = border
-                        ws_docs.cell(row=doc_row, column=2, value=keywords_str).border = border
-                        ws_docs.cell(row=doc_row, column=3, value=title).border = border
-                        ws_docs.cell(row=doc_row, column=4, value=api_type.value).border = border
-                        doc_row += 1
-            
-            # Ajustar anchos documentos
-            ws_docs.column_dimensions['A'].width = 8
-            ws_docs.column_dimensions['B'].width = 60
-            ws_docs.column_dimensions['C'].width = 100
-            ws_docs.column_dimensions['D'].width = 12
+                        ws_docs.append([
+                            bordered(ws_docs, value)
+                            for value in (i, keywords_str, title, api_type.value)
+                        ])
         
         # Guardar archivo
         wb.save(filename)
         
-        print(f"\n{'='*80}")
+        print(f"\n{_SEP_80}")
         print(f"  ARCHIVO CONSOLIDADO GENERADO (XLSX)")
-        print(f"{'='*80}")
+        print(_SEP_80)
         print(f"Archivo: {filename}")
         print(f"APIs incluidas: {', '.join(apis_names)}")
         
         # Mostrar resumen
-        for api_type, combinations in all_results.items():
-            with_results = [r for r in combinations if r.count and r.count > 0]
-            with_results.sort(key=lambda x: x.count or 0, reverse=True)
-            
-            if with_results:
-                print(f"\n[{api_type.value.upper()}] TOP 5 (de {len(with_results)} con resultados):")
-                for i, r in enumerate(with_results[:5], 1):
+        for api_type, (top_30, _, with_results_count) in summaries.items():
+            if top_30:
+                print(f"\n[{api_type.value.upper()}] TOP 5 (de {with_results_count} con resultados):")
+                for i, r in enumerate(top_30[:5], 1):
                     keywords_str = " AND ".join(r.keywords)
                     print(f"  {i:2}. {r.count:,} resultados - {keywords_str}")
             else:
@@ -542,8 +794,7 @@ def run_extended_mode(engine: SearchEngine) -> int:
             "entries": all_entries,
         }
         
-        with open(config.output_results_file, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        _dump_json(output_data, config.output_results_file)
         print(f"\nResultados guardados en: {config.output_results_file}")
     else:
         count_str = input(f"Número de resultados (máx {config.max_per_request}, default 25): ").strip()
@@ -565,8 +816,7 @@ def run_extended_mode(engine: SearchEngine) -> int:
             print(f"Título: {title}")
             print()
         
-        with open(config.output_results_file, "w", encoding="utf-8") as f:
-            json.dump(response, f, indent=2, ensure_ascii=False)
+        _dump_json(response, config.output_results_file)
         print(f"\nRespuesta guardada en: {config.output_results_file}")
     
     return 0
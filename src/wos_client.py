@@ -2,16 +2,33 @@
 Cliente para la API de Web of Science (Clarivate).
 """
 
+import functools
 import re
 import urllib.parse
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .config import API_CONFIGS, APIType
 from .models import SearchFilters, WOSFilters
 from .base_client import BaseAPIClient
 
 
+# Separa una query por sus operadores booleanos, conservándolos en el resultado
+_AND_OR_SPLIT_RE = re.compile(r'\s+(AND|OR)\s+')
+
+# Operadores booleanos que _AND_OR_SPLIT_RE conserva entre los términos
+_BOOL_OPS = frozenset({'AND', 'OR'})
+
+# Condición de tipo de documento (se formatea con %)
+_DT_TEMPLATE = 'DT=("%s")'
+
+
+@functools.lru_cache(maxsize=1)
+def _current_year() -> int:
+    """Año actual, calculado una vez por proceso (una búsqueda no abarca un cambio de año)."""
+    return datetime.now().year
+
+
 class WOSAPIClient(BaseAPIClient):
     """
     Cliente para la API de Web of Science (Clarivate).
@@ -27,6 +44,9 @@ class WOSAPIClient(BaseAPIClient):
     - Institutional Integration: 20,000 req/día
     """
     
+    # Ruta de las entradas en la respuesta de búsqueda
+    ENTRIES_PATH = "Data.Records.records.REC.item"
+    
     # Bases de datos disponibles
     DATABASES = {
         "WOS": "Web of Science Core Collection",
@@ -68,6 +88,8 @@ class WOSAPIClient(BaseAPIClient):
     
     def __init__(self):
         super().__init__(API_CONFIGS[APIType.WOS])
+        # Parámetros de filtros ya codificados, por combinación de filtros
+        self._filter_params_cache: Dict[Tuple, str] = {}
     
     def build_query_url(self, query: str, filters: SearchFilters,
                         max_records: int = 10, start: int = 1) -> str:
@@ -87,12 +109,31 @@ class WOSAPIClient(BaseAPIClient):
         
         # Calcular firstRecord (1-indexed)
         first_record = max(1, start)
+        count = min(max_records, self.config.max_per_request)
         
-        params = {
-            "usrQuery": full_query,
-            "count": str(min(max_records, self.config.max_per_request)),
-            "firstRecord": str(first_record),
-        }
+        # usrQuery es el único valor con texto libre (se codifica igual que urlencode);
+        # count y firstRecord son enteros: no necesitan codificarse
+        return (f"{self.config.base_url}?usrQuery={urllib.parse.quote_plus(full_query)}"
+                f"&count={count}&firstRecord={first_record}&{self._filter_params(filters)}")
+    
+    def _filter_params(self, filters: SearchFilters) -> str:
+        """Retorna sortField, databaseId, edition y publishTimeSpan codificados, una vez por combinación de filtros."""
+        if isinstance(filters, WOSFilters):
+            key = (filters.year_from, filters.year_to, filters.database,
+                   filters.edition, filters.sort_field)
+        else:
+            key = (filters.year_from, filters.year_to)
+        
+        encoded = self._filter_params_cache.get(key)
+        if encoded is None:
+            encoded = self._build_filter_params(filters)
+            self._filter_params_cache[key] = encoded
+        return encoded
+    
+    @staticmethod
+    def _build_filter_params(filters: SearchFilters) -> str:
+        """Codifica los parámetros de la URL que dependen solo de los filtros."""
+        params = {}
         
         # Ordenamiento configurable
         if isinstance(filters, WOSFilters):
@@ -111,11 +152,11 @@ class WOSAPIClient(BaseAPIClient):
         # Rango de fechas usando publishTimeSpan
         if filters.year_from or filters.year_to:
             year_from = filters.year_from or 1900
-            year_to = filters.year_to or datetime.now().year
+            year_to = filters.year_to or _current_year()
             # Formato: YYYY-MM-DD+YYYY-MM-DD
             params["publishTimeSpan"] = f"{year_from}-01-01+{year_to}-12-31"
         
-        return f"{self.config.base_url}?{urllib.parse.urlencode(params)}"
+        return urllib.parse.urlencode(params)
     
     def _build_full_query(self, query: str, filters: SearchFilters, include_years: bool = False) -> str:
         """
@@ -136,45 +177,60 @@ class WOSAPIClient(BaseAPIClient):
                           Si False, los años se manejan via publishTimeSpan
         """
         # Si la query ya tiene formato WOS (contiene '=' como TS=, TI=, etc.), usarla directamente
-        if '=' in query and not query.startswith('"'):
+        if query[:1] != '"' and '=' in query:
             full_query = query
-        # Si la query contiene operadores booleanos AND/OR, cada término debe tener su TS=
-        elif ' AND ' in query or ' OR ' in query:
-            # Dividir por AND/OR y envolver cada término en TS=(...)
-            # Ejemplo: '"CSIRT" AND "risk management"' -> 'TS=(CSIRT) AND TS=(risk management)'
-            parts = re.split(r'\s+(AND|OR)\s+', query)
-            result_parts = []
-            for part in parts:
-                if part in ('AND', 'OR'):
-                    result_parts.append(part)
-                else:
-                    # Limpiar comillas externas del término
-                    term = part.strip().strip('"')
-                    # Envolver en TS=(...) - WoS buscará en título, abstract y keywords
-                    result_parts.append(f'TS=({term})')
-            full_query = ' '.join(result_parts)
         else:
-            # Búsqueda simple: envolver en TS (Topic Search)
-            full_query = f"TS=({query})"
+            has_and = ' AND ' in query
+            has_or = ' OR ' in query
+            # Si la query contiene operadores booleanos AND/OR, cada término debe tener su TS=
+            # Ejemplo: '"CSIRT" AND "risk management"' -> 'TS=(CSIRT) AND TS=(risk management)'
+            if has_and != has_or:
+                # Un solo tipo de operador: basta con str.split, sin pasar por el regex
+                op = ' AND ' if has_and else ' OR '
+                terms = (part.strip().strip('"') for part in query.split(op))
+                full_query = op.join(['TS=(' + term + ')' for term in terms])
+            elif has_and:
+                # Ambos operadores: dividir con el regex conservando cada operador
+                parts = _AND_OR_SPLIT_RE.split(query)
+                result_parts = []
+                for part in parts:
+                    if part in _BOOL_OPS:
+                        result_parts.append(part)
+                    else:
+                        # Limpiar comillas externas del término
+                        term = part.strip().strip('"')
+                        # Envolver en TS=(...) - WoS buscará en título, abstract y keywords
+                        result_parts.append('TS=(' + term + ')')
+                full_query = ' '.join(result_parts)
+            else:
+                # Búsqueda simple: envolver en TS (Topic Search)
+                full_query = 'TS=(' + query + ')'
+        
+        # Sin filtros que agregar (caso habitual: años via publishTimeSpan)
+        document_types = filters.document_types if isinstance(filters, WOSFilters) else None
+        if not include_years and not document_types:
+            return full_query
+        
+        parts = [full_query]
         
         # Agregar filtro de años usando PY solo si se solicita explícitamente
         if include_years:
             if filters.year_from and filters.year_to:
                 if filters.year_from == filters.year_to:
-                    full_query = f"{full_query} AND PY={filters.year_from}"
+                    parts.append(f" AND PY={filters.year_from}")
                 else:
-                    full_query = f"{full_query} AND PY={filters.year_from}-{filters.year_to}"
+                    parts.append(f" AND PY={filters.year_from}-{filters.year_to}")
             elif filters.year_from:
-                full_query = f"{full_query} AND PY>={filters.year_from}"
+                parts.append(f" AND PY>={filters.year_from}")
             elif filters.year_to:
-                full_query = f"{full_query} AND PY<={filters.year_to}"
+                parts.append(f" AND PY<={filters.year_to}")
         
         # Filtrar por tipo de documento si se especifica
-        if isinstance(filters, WOSFilters) and filters.document_types:
-            dt_filter = " OR ".join([f'DT=("{dt}")' for dt in filters.document_types])
-            full_query = f"{full_query} AND ({dt_filter})"
+        if document_types:
+            dt_filter = " OR ".join(map(_DT_TEMPLATE.__mod__, document_types))
+            parts.append(" AND (" + dt_filter + ")")
         
-        return full_query
+        return "".join(parts)
     
     def parse_total_results(self, response: Dict[str, Any]) -> int:
         """
@@ -193,8 +249,10 @@ class WOSAPIClient(BaseAPIClient):
         }
         """
         # Estructura de WoS API (Search endpoint)
-        query_result = response.get("QueryResult", {})
-        records_found = query_result.get("RecordsFound", 0)
+        records_found = response.get("QueryResult", {}).get("RecordsFound")
+        # Caso habitual: número JSON, ya es int
+        if type(records_found) is int and records_found:
+            return records_found
         if records_found:
             return int(records_found)
         
@@ -217,37 +275,74 @@ class WOSAPIClient(BaseAPIClient):
             }
         }
         """
+        # Caso habitual: acceso directo a la ruta completa (EAFP)
+        try:
+            rec = response["Data"]["Records"]["records"]["REC"]
+            # Un único registro puede venir como dict en lugar de lista
+            return rec if type(rec) is list else [rec] if rec else []
+        except (KeyError, TypeError):
+            pass
+        
         # Estructura de WoS API (Search endpoint) - datos en "Data"
         data = response.get("Data", {})
         records = data.get("Records", {})
         
         if records:
-            # Los records pueden estar en diferentes formatos
-            if isinstance(records, dict):
+            # Los records pueden estar en diferentes formatos. La respuesta viene
+            # de json.loads, así que basta comparar el tipo exacto (sin isinstance)
+            if type(records) is dict:
                 records_data = records.get("records", {})
-                if isinstance(records_data, dict):
+                if type(records_data) is dict:
                     return records_data.get("REC", [])
-                return records_data if isinstance(records_data, list) else []
-            return records if isinstance(records, list) else []
+                return records_data if type(records_data) is list else []
+            return records if type(records) is list else []
         
         # Fallback: estructura de WoS Starter API
         return response.get("hits", [])
     
-    def _get_headers(self) -> Optional[Dict[str, str]]:
-        """WOS usa X-ApiKey header para autenticación."""
+    def iter_entries(self, response: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Genera las entradas de la respuesta de WOS API una a una.
+        
+        Recorre la misma ruta que parse_entries sin construir una lista
+        nueva en quien la consume.
+        """
+        yield from self.parse_entries(response)
+    
+    def authenticate(self) -> bool:
+        """Obtiene la API key y descarta los headers creados con la key anterior."""
+        authenticated = super().authenticate()
+        self.__dict__.pop("_headers", None)
+        return authenticated
+    
+    @functools.cached_property
+    def _headers(self) -> Dict[str, str]:
+        """Headers de WOS, creados en el primer uso con la API key vigente."""
         return {
             "X-ApiKey": self.api_key,
             "Accept": "application/json",
         }
     
+    def _get_headers(self) -> Optional[Dict[str, str]]:
+        """
+        WOS usa X-ApiKey header para autenticación.
+        
+        Se retorna siempre el mismo dict: no debe modificarse (HTTPClient
+        lo combina con los headers por defecto en un dict nuevo).
+        """
+        return self._headers
+    
     def _get_mask_key(self) -> Optional[str]:
         """WOS usa header para API key, no necesita enmascarar en URL."""
         return None
     
-    def extract_document_titles(self, entries: List[Dict[str, Any]]) -> List[str]:
+    def extract_document_titles(self, entries: Iterable[Dict[str, Any]]) -> List[str]:
         """
         Extrae los títulos de los documentos de WOS.
         
+        Acepta cualquier iterable de entradas o directamente la respuesta
+        de la API (se recorre con iter_entries).
+        
         La estructura de WoS API tiene títulos en:
         {
             "static_data": {
@@ -259,33 +354,29 @@ class WOSAPIClient(BaseAPIClient):
             }
         }
         """
-        titles = []
-        for entry in entries:
-            title = None
-            
-            # WoS API: Estructura anidada en static_data
-            static_data = entry.get('static_data', {})
-            if static_data:
-                summary = static_data.get('summary', {})
-                titles_data = summary.get('titles', {})
-                title_list = titles_data.get('title', [])
-                
-                # Buscar el título de tipo "item" (título principal)
-                if isinstance(title_list, list):
-                    for t in title_list:
-                        if isinstance(t, dict) and t.get('type') == 'item':
-                            title = t.get('content', '')
-                            break
-                elif isinstance(title_list, dict):
-                    title = title_list.get('content', '')
-            
-            # Fallback: WOS Starter API usa el campo 'title' directamente
-            if not title:
-                title = entry.get('title', '')
+        if type(entries) is dict:
+            entries = self.iter_entries(entries)
+        return [title for entry in entries if (title := self._pick_title(entry))]
+    
+    @staticmethod
+    def _pick_title(entry: Dict[str, Any]) -> str:
+        """Retorna el título principal de una entrada de WOS ('' si no tiene)."""
+        title = None
+        
+        # WoS API: Estructura anidada en static_data
+        static_data = entry.get('static_data', {})
+        if static_data:
+            title_list = static_data.get('summary', {}).get('titles', {}).get('title', [])
             
-            if title:
-                titles.append(title)
-        return titles
+            # Buscar el título de tipo "item" (título principal)
+            if isinstance(title_list, list):
+                title = next((t.get('content', '') for t in title_list
+                              if isinstance(t, dict) and t.get('type') == 'item'), None)
+            elif isinstance(title_list, dict):
+                title = title_list.get('content', '')
+        
+        # Fallback: WOS Starter API usa el campo 'title' directamente
+        return title or entry.get('title', '')
     
     def get_document_by_uid(self, uid: str) -> Dict[str, Any]:
         """